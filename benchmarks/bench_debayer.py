@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Manchun LEI
+LASTIG, Univ. Gustave Eiffel, ENSG, IGN, F-94160 Saint-Mandé, France
+
+Module name:
+    bench_debayer
+    ---------------
+    Benchmark of the debayer functions of util against the former
+    implementations, on full frame and ROI shapes.
+    Run from the repository root: python benchmarks/bench_debayer.py
+"""
+
+import os
+import sys
+import timeit
+import tracemalloc
+import numpy as np
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import util
+
+SHAPES = {'full 1920x1080':(1080,1920),
+          'roi 640x480':(480,640)}
+
+def debayer_sub_legacy(data):
+    '''former util.debayer_sub, row index lists and fancy indexing'''
+    nl,nc = np.shape(data)
+    nl = int(nl/2)
+    nc = int(nc/2)
+    l0 = [[0]]
+    l1 = [[1]]
+    for x in np.arange(nl-1):
+        l0.append([x*2+2])
+        l1.append([x*2+3])
+    c0 = np.arange(nc)*2
+    c1 = np.arange(nc)*2+1
+    
+    data1 = np.empty([nl,nc,4],data.dtype)
+    data1[:,:,0] = data[l0,c1]  #r
+    data1[:,:,1] = data[l0,c0]  #g1
+    data1[:,:,2] = data[l1,c1]  #g2
+    data1[:,:,3] = data[l1,c0]  #b
+    return data1
+
+def debayer_sub_rgb_legacy(data):
+    '''former util.debayer_sub_rgb, float64 green average'''
+    deb_sub = debayer_sub_legacy(data)
+    ny,nx,_ = deb_sub.shape
+    rgb = np.empty([ny,nx,3],dtype=data.dtype)
+    rgb[:,:,0] = deb_sub[:,:,0]
+    rgb[:,:,1] = deb_sub[:,:,1]*0.5+deb_sub[:,:,2]*0.5
+    rgb[:,:,2] = deb_sub[:,:,3]
+    return rgb
+
+def debayer_full_legacy(data):
+    '''former util.debayer_full, kept for timing only'''
+    nl,nc = np.shape(data)
+    l0 = [[0]]
+    l1 = [[1]]
+    for x in np.arange(int(nl/2)-1):
+        l0.append([x*2+2])
+        l1.append([x*2+3])
+    c0 = np.arange(int(nc/2))*2
+    c1 = np.arange(int(nc/2))*2+1
+    
+    r = np.empty([nl,nc],dtype=np.float32)
+    g = np.empty([nl,nc],dtype=np.float32)
+    b = np.empty([nl,nc],dtype=np.float32)
+    g[l0,c0] = data[l0,c0].astype(np.float32) #g1
+    r[l0,c1] = data[l0,c1].astype(np.float32)
+    b[l1,c0] = data[l1,c0].astype(np.float32)
+    g[l1,c1] = data[l1,c1].astype(np.float32) #g2
+    
+    #les 4 cones
+    r[0,0] = r[0,1]
+    b[0,0] = b[1,0]
+    g[0,nc-1] = (g[0,nc-2]+g[1,nc-1])/2
+    b[0,nc-1] = b[1,nc-2]
+    r[nl-1,0] = r[nl-2,1]
+    g[nl-1,0] = (g[nl-2,0]+g[nl-1,1])/2
+    r[nl-1,nc-1] = r[nl-2,nc-1]
+    b[nl-1,nc-1] = b[nl-1,nc-2]
+            
+    #permier ligne
+    g[0,1:nc-2:2] = (g[0,0:nc-3:2]+g[0,2:nc-1:2]+g[1,1:nc-2:2])/3
+    b[0,1:nc-2:2] = (b[1,0:nc-3:2]+b[1,2:nc-1:2])/2
+    r[0,2:nc-1:2] = (r[0,1:nc-2:2]+r[0,3:nc:2])/2
+    b[0,2:nc-1:2] = b[1,2:nc-1:2]
+    #dernier ligne
+    r[nl-1,1:nc-2:2] = r[nl-2,1:nc-2:2]
+    b[nl-1,1:nc-2:2] = (b[nl-1,0:nc-3:2]+b[nl-1,2:nc-1:2])/2
+    r[nl-1,2:nc-1:2] = (r[nl-2,1:nc-2:2]+r[nl-2,3:nc:2])/2
+    g[nl-1,2:nc-1:2] = (g[nl-1,1:nc-2:2]+g[nl-1,3:nc:2]+g[nl-2,2:nc-1:2])/3
+    #permier colonne
+    r[1:nl-2:2,0] = 0.5*(r[0:nl-3:2,1]+r[2:nl-1:2,1])
+    g[1:nl-2:2,0] = (g[0:nl-3:2,0]+g[2:nl-1:2,0]+g[1:nl-2:2,1])/3
+    r[2:nl-1:2,0] = r[2:nl-1:2,1]
+    b[2:nl-1:2,0] = (b[1:nl-2:2,0]+b[3:nl:2,0])/2
+    #dernier colonne
+    r[1:nl-2:2,nc-1] = (r[0:nl-3:2,nc-1]+r[2:nl-1:2,nc-1])/2
+    b[1:nl-2:2,nc-1] = b[1:nl-2:2,nc-2]
+    g[2:nl-1:2,nc-1] = (g[1:nl-2:2,nc-1]+g[3:nl:2,nc-1]+g[2:nl-1:2,nc-2])/3
+    b[2:nl-1:2,nc-1] = (b[1:nl-2:2,nc-2]+b[3:nl:2,nc-2])/2   
+    #filtre rouge
+    g[2:nl-1:2,1:nc-2:2] = (g[1:nl-2:2,1:nc-2:2]+\
+                            g[3:nl:2  ,1:nc-2:2]+\
+                            g[2:nl-1:2,0:nc-3:2]+\
+                            g[2:nl-1:2,2:nc-1:2])/4
+    b[2:nl-1:2,1:nc-2:2] = (b[1:nl-2:2,0:nc-3:2]+\
+                            b[1:nl-2:2,2:nc-1:2]+\
+                            b[3:nl:2  ,0:nc-3:2]+\
+                            b[3:nl:2  ,2:nc-1:2])/4
+         
+    #filtre vert1(ligne paire, colonne paire)
+    r[2:nl-1:2,2:nc-1:2] = (r[2:nl-1:2,1:nc-2:2]+r[2:nl-1:2,3:nc:2])/2
+    b[2:nl-1:2,2:nc-1:2] = (b[1:nl-2:2,2:nc-1:2]+b[3:nl:2,2:nc-1:2])/2
+        
+    #filtre vert2(ligne impaire, colonne impaire)
+    r[1:nl-2:2,1:nc-2:2] = (r[0:nl-3:2,1:nc-2:2]+r[2:nl-1:2,1:nc-2:2])/2
+    b[1:nl-2:2,1:nc-2:2] = (b[1:nl-2:2,0:nc-3:2]+b[1:nl-2:2,2:nc-1:2])/2
+    
+    #filtre bleu
+    r[1:nl-2:2,2:nc-1:2] = (r[0:nl-3:2,1:nc-2:2]+\
+                            r[2:nl-1:2,  3:nc:2]+\
+                            r[0:nl-3:2,1:nc-2:2]+\
+                            r[2:nl-1:2,  3:nc:2])/4
+    g[1:nl-2:2,2:nc-1:2] = (g[1:nl-2:2,1:nc-2:2]+\
+                            g[1:nl-2:2,  3:nc:2]+\
+                            g[0:nl-3:2,2:nc-1:2]+\
+                            g[2:nl-1:2,2:nc-1:2])/4
+            
+    rgb = np.empty([nl,nc,3],dtype=data.dtype)
+    rgb[:,:,0] = r
+    rgb[:,:,1] = g
+    rgb[:,:,2] = b    
+    
+    return rgb
+
+def debayer_full_reference(data,integer=True):
+    '''reference bilinear demosaic of a GRBG image by 3x3 convolution
+    of the masked color planes, with a mirror border'''
+    nl,nc = np.shape(data)
+    p = np.pad(data,1,mode='reflect').astype(np.float64)
+    y,x = np.mgrid[-1:nl+1,-1:nc+1]
+    masks = [(y%2==0)&(x%2==1),(y%2)==(x%2),(y%2==1)&(x%2==0)]
+    k_rb = np.array([[1,2,1],[2,4,2],[1,2,1]])/4.
+    k_g = np.array([[0,1,0],[1,4,1],[0,1,0]])/4.
+    rgb = np.zeros([nl,nc,3])
+    for c,(mask,k) in enumerate(zip(masks,[k_rb,k_g,k_rb])):
+        plane = p*mask
+        for dy in range(3):
+            for dx in range(3):
+                rgb[:,:,c] += k[dy,dx]*plane[dy:dy+nl,dx:dx+nc]
+    if integer:
+        rgb = np.floor(rgb+0.5)
+    return rgb
+
+
+def bench(label,func,data,number):
+    t = min(timeit.repeat(lambda:func(data),number=number,repeat=5))/number
+    print('  {:<28s}{:10.3f} ms'.format(label,t*1e3))
+    return t
+
+def peak_alloc(func,data):
+    '''peak of the memory allocated by func(data), in MB'''
+    tracemalloc.start()
+    func(data)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak/2**20
+
+def bench_debayer_sub_rgb(number=20):
+    print('debayer_sub_rgb, full 1920x1080 uint16')
+    data = np.random.randint(0,4096,SHAPES['full 1920x1080']).astype(np.uint16)
+    out = util.debayer_sub_rgb(data)
+    assert np.array_equal(out,debayer_sub_rgb_legacy(data))
+    funcs = [('legacy debayer_sub_rgb',debayer_sub_rgb_legacy),
+             ('debayer_sub_rgb',util.debayer_sub_rgb),
+             ('debayer_sub_rgb out=',lambda d:util.debayer_sub_rgb(d,out=out)),
+             ('debayer_sub_rgb radiometric',
+              lambda d:util.debayer_sub_rgb(d,radiometric=True,bits=12))]
+    for label,func in funcs:
+        bench(label,func,data,number)
+        print('  {:<28s}{:10.3f} MB peak'.format('',peak_alloc(func,data)))
+
+def bench_debayer_sub(number=20):
+    print('debayer_sub')
+    for name,shape in SHAPES.items():
+        data = np.random.randint(0,4096,shape).astype(np.uint16)
+        assert np.array_equal(util.debayer_sub(data),debayer_sub_legacy(data))
+        print(name)
+        t0 = bench('legacy debayer_sub',debayer_sub_legacy,data,number)
+        t1 = bench('debayer_sub',util.debayer_sub,data,number)
+        bench('debayer_sub_planes (views)',util.debayer_sub_planes,data,number)
+        bench('debayer_sub_planes (copy)',
+              lambda d:util.debayer_sub_planes(d,copy=True),data,number)
+        print('  speedup debayer_sub: x{:.1f}'.format(t0/t1))
+
+def check_debayer_full():
+    for name,shape in SHAPES.items():
+        data = np.random.randint(0,4096,shape).astype(np.uint16)
+        ref = debayer_full_reference(data)
+        assert np.array_equal(util.debayer_full(data),ref)
+        ref = debayer_full_reference(data,integer=False)
+        np.testing.assert_allclose(util.debayer_full(data,dtype=np.float32),ref,rtol=1e-6)
+    print('debayer_full matches the reference implementation')
+
+def bench_debayer_full(number=5):
+    print('debayer_full')
+    for name,shape in SHAPES.items():
+        data = np.random.randint(0,4096,shape).astype(np.uint16)
+        out = np.empty(shape+(3,),np.uint16)
+        print(name)
+        t0 = bench('legacy debayer_full',debayer_full_legacy,data,number)
+        t1 = bench('debayer_full uint16',util.debayer_full,data,number)
+        bench('debayer_full uint16 out=',lambda d:util.debayer_full(d,out=out),data,number)
+        bench('debayer_full float32',
+              lambda d:util.debayer_full(d,dtype=np.float32),data,number)
+        print('  speedup debayer_full: x{:.1f}'.format(t0/t1))
+
+def bench_tiled(number=5,tile_rows=128,workers=4):
+    print('tiled debayer, tile_rows={} workers={}'.format(tile_rows,workers))
+    data = np.random.randint(0,4096,SHAPES['full 1920x1080']).astype(np.uint16)
+    for func in (util.debayer_full,util.debayer_sub_rgb):
+        ref = func(data)
+        for w in (1,workers):
+            assert np.array_equal(func(data,tile_rows=tile_rows,workers=w),ref)
+        print(func.__name__)
+        t0 = bench('single band',func,data,number)
+        bench('tiles, 1 worker',lambda d:func(d,tile_rows=tile_rows),data,number)
+        t1 = bench('tiles, {} workers'.format(workers),
+                   lambda d:func(d,tile_rows=tile_rows,workers=workers),data,number)
+        print('  speedup: x{:.1f}'.format(t0/t1))
+
+def bench_stack(n=200,number=3):
+    for shape in (SHAPES['roi 640x480'],(64,64)):
+        print('stack of {} frames {}x{}'.format(n,shape[1],shape[0]))
+        stack = np.random.randint(0,4096,(n,)+shape).astype(np.uint16)
+        for func in (util.debayer_sub_rgb,util.debayer_full):
+            assert np.array_equal(func(stack),np.stack([func(d) for d in stack]))
+            print(func.__name__)
+            t0 = bench('frame by frame',lambda s:[func(d) for d in s],stack,number)
+            t1 = bench('one call',func,stack,number)
+            print('  speedup: x{:.1f}'.format(t0/t1))
+
+if __name__ == '__main__':
+    bench_debayer_sub()
+    bench_debayer_sub_rgb()
+    check_debayer_full()
+    bench_debayer_full()
+    bench_tiled()
+    bench_stack()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Manchun LEI
+LASTIG, Univ. Gustave Eiffel, ENSG, IGN, F-94160 Saint-Mandé, France
+
+Module name:
+    bench_frame_lookup
+    ---------------
+    Benchmark of the frame callback of Camera (frame lookup by buffer
+    address under frames_lock, then the frame handler) for buffer_count
+    from 5 to 500, in ns per callback, against the former linear scan of
+    the frames. The frame delivered is the last of the frames, the worst
+    case of the scan, and the handler does nothing.
+    The callback is called directly, so no Vimba installation is needed.
+    Run from the repository root: python benchmarks/bench_frame_lookup.py
+"""
+
+import os
+import sys
+import timeit
+from ctypes import pointer
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vimba import Camera, Frame, AllocationMode
+from vimba.c_binding import VmbCameraInfo, VmbHandle
+from vimba.camera import _Context, _CaptureFsm, _frame_handle_accessor
+
+def handler(cam,frame):
+    pass
+
+def legacy_cb(cam,context,raw_frame_ptr):
+    '''former frame lookup of Camera.__frame_cb_wrapper'''
+    with context.frames_lock:
+        raw_frame = raw_frame_ptr.contents
+        frame = None
+        for f in context.frames:
+            if raw_frame.buffer==_frame_handle_accessor(f).buffer:
+                frame = f
+                break
+        assert frame is not None
+        context.frames_handler(cam,frame)
+
+def bench_frame_lookup(counts=(5,10,50,100,500),number=50000):
+    cam = Camera(VmbCameraInfo())
+    frame_cb = cam._Camera__frame_cb_wrapper
+    handle = VmbHandle(0)
+    print('frame callback, ns per call')
+    print('  {:>12s}{:>12s}{:>12s}'.format('buffer_count','former','dict'))
+    for count in counts:
+        frames = tuple(Frame(16,AllocationMode.AnnounceFrame) for _ in range(count))
+        context = _Context(cam,frames,handler,None)
+        #as filled once the frames are announced
+        context.frames_by_buffer = {_frame_handle_accessor(f).buffer:f for f in frames}
+        cam._Camera__capture_fsm = _CaptureFsm(context)
+        raw_frame_ptr = pointer(_frame_handle_accessor(frames[-1]))
+        t_legacy = min(timeit.repeat(lambda:legacy_cb(cam,context,raw_frame_ptr),
+                                     number=number,repeat=5))
+        t_dict = min(timeit.repeat(lambda:frame_cb(handle,raw_frame_ptr),
+                                   number=number,repeat=5))
+        print('  {:12d}{:12.0f}{:12.0f}'.format(count,t_legacy/number*1e9,t_dict/number*1e9))
+    cam._Camera__capture_fsm = None
+
+if __name__ == '__main__':
+    bench_frame_lookup()
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Manchun LEI
+LASTIG, Univ. Gustave Eiffel, ENSG, IGN, F-94160 Saint-Mandé, France
+
+Module name:
+    bench_import
+    ---------------
+    Benchmark of the import time of the vimba package.
+    Each case runs in a new interpreter. The former eager import (all the
+    submodules, both native libraries and the pixel format convertibility
+    queries) is reproduced by loading them explicitly, it needs the Vimba
+    installation and is reported as not available without it.
+    Run from the repository root: python benchmarks/bench_import.py
+"""
+
+import os
+import sys
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+EAGER = '''
+from vimba import *
+from vimba.c_binding import vimba_c, vimba_image_transform, PIXEL_FORMAT_CONVERTIBILITY_MAP
+vimba_c._get_lib()
+vimba_image_transform._get_lib()
+for fmt in PIXEL_FORMAT_CONVERTIBILITY_MAP:
+    PIXEL_FORMAT_CONVERTIBILITY_MAP[fmt]
+'''
+
+CASES = [
+    ('import vimba','import vimba',{}),
+    ('from vimba import *','from vimba import *',{}),
+    ('former eager import',EAGER,{'VIMBA_PYTHON_CACHE_DIR':''}),
+    ('eager, convertibility cached',EAGER,{}),
+]
+
+TIMER = '''
+import sys,time
+sys.path.insert(0,{root!r})
+t = time.perf_counter()
+exec({code!r})
+print(time.perf_counter()-t)
+'''
+
+def run(code,env,repeat):
+    '''min time in s of code in new interpreters, or the error message'''
+    env = dict(os.environ,**env)
+    times = []
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable,'-c',TIMER.format(root=ROOT,code=code)],
+                              env=env,capture_output=True,text=True)
+        if proc.returncode:
+            lines = proc.stderr.strip().splitlines()
+            return lines[-1] if lines else 'error {}'.format(proc.returncode)
+        times.append(float(proc.stdout.split()[-1]))
+    return min(times)
+
+def bench_import(repeat=5):
+    print('import time, min of {} new interpreters'.format(repeat))
+    for label,code,env in CASES:
+        t = run(code,env,repeat)
+        if isinstance(t,str):
+            print('  {:<32s} not available: {}'.format(label,t))
+        else:
+            print('  {:<32s}{:10.1f} ms'.format(label,t*1e3))
+
+if __name__ == '__main__':
+    bench_import()
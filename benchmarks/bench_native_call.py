@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Manchun LEI
+LASTIG, Univ. Gustave Eiffel, ENSG, IGN, F-94160 Saint-Mandé, France
+
+Module name:
+    bench_native_call
+    ---------------
+    Benchmark of the per call overhead of the c_binding layer, in ns per
+    call: call_vimba_c('VmbCaptureFrameQueue',...) against the pre-resolved
+    vmb.CaptureFrameQueue(...) and the bare native function.
+    The Vimba library is replaced by a stub whose functions are the C
+    function labs of the C library, so no Vimba installation is needed.
+    Run from the repository root: python benchmarks/bench_native_call.py
+"""
+
+import os
+import sys
+import ctypes
+import ctypes.util
+import timeit
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vimba import NativeCallStats
+from vimba.c_binding import vimba_c, call_vimba_c, vmb
+
+class StubLib():
+    '''stub of VimbaC, every function is labs'''
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'))
+        self.labs = libc.labs
+        self.labs.argtypes = [ctypes.c_long]
+        self.labs.restype = ctypes.c_long
+
+    def __getattr__(self,name):
+        return self.labs
+
+def ns_per_call(func,number):
+    t = min(timeit.repeat(func,number=number,repeat=5))
+    return t/number*1e9
+
+def bench_native_call(number=200000):
+    stub = StubLib()
+    vimba_c._lib_instance = stub
+    native = stub.labs
+    queue = vmb.CaptureFrameQueue
+
+    cases = [('call_vimba_c',lambda:call_vimba_c('VmbCaptureFrameQueue',-1)),
+             ('vmb.CaptureFrameQueue',lambda:vmb.CaptureFrameQueue(-1)),
+             ('vmb, bound locally',lambda:queue(-1)),
+             ('native function',lambda:native(-1))]
+    print('native call overhead, ns per call')
+    for stats in (False,True):
+        if stats:
+            NativeCallStats.get_instance().enable()
+            print('with NativeCallStats enabled')
+        for label,func in cases:
+            print('  {:<32s}{:10.0f}'.format(label,ns_per_call(func,number)))
+
+if __name__ == '__main__':
+    bench_native_call()
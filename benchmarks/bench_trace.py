@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Manchun LEI
+LASTIG, Univ. Gustave Eiffel, ENSG, IGN, F-94160 Saint-Mandé, France
+
+Module name:
+    bench_trace
+    ---------------
+    Benchmark of the TraceEnable overhead on a trivial function, in calls
+    per second: log disabled, timing spans recorded in the ring buffer,
+    trace log enabled (to a null stream) and the undecorated function.
+    The decoration-time disable (VIMBA_PYTHON_TRACE=0) returns the
+    undecorated function, so it has the last result.
+    Run from the repository root: python benchmarks/bench_trace.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vimba import Log, LogConfig, LogLevel, TraceEnable
+
+def noop(x):
+    return x
+
+def calls_per_s(func,number):
+    t = min(timeit.repeat(lambda:func(1),number=number,repeat=5))
+    return number/t
+
+def bench_trace(number=200000):
+    traced = TraceEnable()(noop)
+
+    print('TraceEnable, calls per second')
+    results = [('log disabled',calls_per_s(traced,number))]
+    spans = TraceEnable.enable_spans()
+    results.append(('timing spans',calls_per_s(traced,number)))
+    TraceEnable.disable_spans()
+    config = LogConfig().add_console_log(LogLevel.Trace)
+    config.get_handlers()[0].setStream(open(os.devnull,'w'))
+    Log.get_instance().enable(config)
+    results.append(('trace log enabled',calls_per_s(traced,number//10)))
+    Log.get_instance().disable()
+    results.append(('undecorated',calls_per_s(noop,number)))
+    for label,n in results:
+        print('  {:<32s}{:12.0f}   x{:.1f}'.format(label,n,n/results[0][1]))
+    print('{} spans recorded, slowest: {} ns'.format(
+        len(spans),[stop-start for _,_,start,stop in spans.get_slowest(3)]))
+
+if __name__ == '__main__':
+    bench_trace()
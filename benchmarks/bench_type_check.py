@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Manchun LEI
+LASTIG, Univ. Gustave Eiffel, ENSG, IGN, F-94160 Saint-Mandé, France
+
+Module name:
+    bench_type_check
+    ---------------
+    Benchmark of the RuntimeTypeCheckEnable overhead on Camera.queue_frame,
+    in calls per second, against the former decorator which bound the
+    signature and resolved the type hints at each call.
+    The camera is not streaming, so queue_frame returns after the decorators
+    and no Vimba installation is needed.
+    Run from the repository root: python benchmarks/bench_type_check.py
+"""
+
+import os
+import sys
+import timeit
+from inspect import signature
+from typing import get_type_hints
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vimba import Camera, Frame, AllocationMode, RuntimeTypeCheckEnable, TraceEnable
+from vimba.c_binding import VmbCameraInfo
+from vimba.util import RaiseIfOutsideContext
+
+def legacy_type_check(func):
+    '''former RuntimeTypeCheckEnable wrapper'''
+    checker = RuntimeTypeCheckEnable()
+    verify = checker._RuntimeTypeCheckEnable__verify_arg
+
+    def wrapper(*args,**kwargs):
+        full_args = signature(func).bind(*args,**kwargs)
+        full_args.apply_defaults()
+        hints = get_type_hints(func)
+        hints.pop('return',None)
+        for arg_name in hints:
+            verify(func,hints[arg_name],(arg_name,full_args.arguments[arg_name]))
+        return func(*args,**kwargs)
+    return wrapper
+
+def calls_per_s(func,cam,frame,number):
+    t = min(timeit.repeat(lambda:func(cam,frame),number=number,repeat=5))
+    return number/t
+
+def bench_queue_frame(number=100000):
+    cam = Camera(VmbCameraInfo())
+    cam._context_entered = True
+    frame = Frame(16,AllocationMode.AnnounceFrame)
+    queue_frame = Camera.queue_frame
+    #TraceEnable -> RaiseIfOutsideContext -> RuntimeTypeCheckEnable -> queue_frame
+    raw = queue_frame.__wrapped__.__wrapped__.__wrapped__
+    legacy = TraceEnable()(RaiseIfOutsideContext()(legacy_type_check(raw)))
+    unchecked = TraceEnable()(RaiseIfOutsideContext()(raw))
+
+    print('Camera.queue_frame, calls per second')
+    results = [('former type check',calls_per_s(legacy,cam,frame,number//10)),
+               ('cached validator',calls_per_s(queue_frame,cam,frame,number))]
+    RuntimeTypeCheckEnable.set_enabled(False)
+    results.append(('checks disabled (set_enabled)',calls_per_s(queue_frame,cam,frame,number)))
+    RuntimeTypeCheckEnable.set_enabled(True)
+    results.append(('no type check decorator',calls_per_s(unchecked,cam,frame,number)))
+    for label,n in results:
+        print('  {:<32s}{:12.0f}   x{:.1f}'.format(label,n,n/results[0][1]))
+
+if __name__ == '__main__':
+    bench_queue_frame()
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Manchun LEI
+LASTIG, Univ. Gustave Eiffel, ENSG, IGN, F-94160 Saint-Mandé, France
+
+Module name:
+    catalog
+    ---------------
+    SQLite catalog of the tif files written by vimba_util acquisitions.
+    The tags created by util.create_exif_tag are stored in an indexed table,
+    so frames can be found by exposure time, datetime and ROI without
+    reading the files again.
+    Files are added at save time (catalog argument of the vimba_util
+    acquisition functions) or by an incremental scan of a directory.
+"""
+
+import os
+import glob
+import sqlite3
+import threading
+from datetime import datetime, date, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from util import read_exif_selected_tags, read_raw_stack
+
+#columns of the selected tags, see util.convert_selected_tags_to_dict
+_COLUMNS = [('camera','TEXT'),('pixel_format','TEXT'),('description','TEXT'),
+            ('bits','INTEGER'),('datetime','TEXT'),('fnumber','REAL'),
+            ('exposure','REAL'),('nx','INTEGER'),('ny','INTEGER'),
+            ('offset_x','INTEGER'),('offset_y','INTEGER')]
+_NAMES = [name for name,_ in _COLUMNS]
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS frames (
+    file TEXT PRIMARY KEY,
+    mtime REAL,
+    size INTEGER,
+    {});
+CREATE INDEX IF NOT EXISTS frames_exposure ON frames (exposure);
+CREATE INDEX IF NOT EXISTS frames_datetime ON frames (datetime);
+CREATE INDEX IF NOT EXISTS frames_roi ON frames (nx,ny,offset_x,offset_y);
+'''.format(',\n    '.join('{} {}'.format(name,typ) for name,typ in _COLUMNS))
+
+class Catalog():
+    '''
+    catalog of acquisition files in a SQLite database.
+    can be used with the "with" statement, the database is closed on exit.
+    '''
+    def __init__(self,dbfile):
+        self.dbfile = dbfile
+        #frames can be added from the writer threads of vimba_util,
+        #every use of the connection holds _lock
+        self._con = sqlite3.connect(dbfile,check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._con:
+            self._con.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,exc_type,exc_value,exc_traceback):
+        self.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._con.execute('SELECT COUNT(*) FROM frames').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._con.close()
+
+    def _upsert(self,rows):
+        sql = 'INSERT OR REPLACE INTO frames (file,mtime,size,{}) VALUES ({})'.format(
+            ','.join(_NAMES),','.join('?'*(len(_NAMES)+3)))
+        with self._lock, self._con:
+            self._con.executemany(sql,rows)
+
+    @staticmethod
+    def _row(file,tags,st):
+        return [file,st.st_mtime,st.st_size]+[tags.get(name) for name in _NAMES]
+
+    def add(self,file,tags=None):
+        '''
+        add or update a file.
+        tags: selected tags dict (util.read_exif_selected_tags), read from
+        the file header if None.
+        '''
+        file = os.path.abspath(file)
+        if tags is None:
+            tags = read_exif_selected_tags(file)
+        self._upsert([self._row(file,tags,os.stat(file))])
+
+    def scan(self,srcpath,pattern='*.tif',recursive=False,workers=8):
+        '''
+        incremental scan of srcpath: only the files that are new or whose
+        mtime or size changed since the last scan are read.
+        files that can not be read are reported and skipped, files removed
+        during the scan are skipped.
+        return the number of files added or updated.
+        '''
+        if recursive:
+            srcfiles = glob.glob(os.path.join(srcpath,'**',pattern),recursive=True)
+        else:
+            srcfiles = glob.glob(os.path.join(srcpath,pattern))
+        with self._lock:
+            known = dict((file,(mtime,size)) for file,mtime,size in
+                         self._con.execute('SELECT file,mtime,size FROM frames'))
+        changed = []
+        for file in srcfiles:
+            file = os.path.abspath(file)
+            try:
+                st = os.stat(file)
+            except FileNotFoundError:
+                #removed since the glob, e.g. by a concurrent cleanup
+                continue
+            if known.get(file)!=(st.st_mtime,st.st_size):
+                changed.append((file,st))
+
+        def read(item):
+            file,st = item
+            try:
+                return self._row(file,read_exif_selected_tags(file),st)
+            except Exception as e:
+                print('error reading tags of {}: {}'.format(file,e))
+                return None
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            rows = [row for row in pool.map(read,changed) if row is not None]
+        self._upsert(rows)
+        return len(rows)
+
+    def prune(self):
+        '''
+        remove the files that do not exist anymore, return their number
+        '''
+        with self._lock:
+            files = [file for file, in self._con.execute('SELECT file FROM frames')]
+        files = [file for file in files if not os.path.exists(file)]
+        with self._lock, self._con:
+            self._con.executemany('DELETE FROM frames WHERE file=?',[(f,) for f in files])
+        return len(files)
+
+    def _select(self,columns,exposure=None,day=None,start=None,end=None,roi=None,
+                pixel_format=None,rtol=1e-3):
+        where = []
+        args = []
+        if exposure is not None:
+            where.append('exposure BETWEEN ? AND ?')
+            args += [exposure*(1-rtol),exposure*(1+rtol)]
+        if day is not None:
+            if isinstance(day,str):
+                day = datetime.strptime(day[:10],'%Y-%m-%d')
+            start = datetime(day.year,day.month,day.day)
+            end = start+timedelta(days=1)
+        if start is not None:
+            where.append('datetime >= ?')
+            args.append(_format_datetime(start))
+        if end is not None:
+            where.append('datetime < ?')
+            args.append(_format_datetime(end))
+        if roi is not None:
+            where.append('nx=? AND ny=? AND offset_x=? AND offset_y=?')
+            args += list(roi)
+        if pixel_format is not None:
+            where.append('pixel_format=?')
+            args.append(str(pixel_format))
+        sql = 'SELECT {} FROM frames'.format(','.join(columns))
+        if where:
+            sql += ' WHERE '+' AND '.join(where)
+        sql += ' ORDER BY datetime,file'
+        with self._lock:
+            return self._con.execute(sql,args).fetchall()
+
+    def query(self,**criteria):
+        '''
+        files matching all the given criteria, ordered by datetime.
+        exposure: exposure time in s, matched with relative tolerance rtol
+        day: 'YYYY-MM-DD', date or datetime
+        start,end: datetime range [start,end[, 'YYYY-MM-DD HH:MM:SS' or datetime
+        roi: (nx,ny,offset_x,offset_y)
+        pixel_format: str, e.g. 'BayerGR16'
+        rtol: relative tolerance of exposure, default 1e-3
+        '''
+        return [file for file, in self._select(['file'],**criteria)]
+
+    def query_tags(self,**criteria):
+        '''
+        {file:selected tags dict} of the files matching criteria, see query
+        '''
+        rows = self._select(['file']+_NAMES,**criteria)
+        return {row[0]:dict(zip(_NAMES,row[1:])) for row in rows}
+
+    def query_stack(self,out=None,**criteria):
+        '''
+        raw frames of the files matching criteria (see query) as a stack
+        [n,nl,nc], the files must have the same shape.
+        out: see util.read_raw_stack
+        '''
+        files = self.query(**criteria)
+        if not files:
+            return None
+        return read_raw_stack(files,out=out)
+
+def _format_datetime(dt):
+    if isinstance(dt,date):
+        return dt.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+    return str(dt)
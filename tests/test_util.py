@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+Module name:
+    test_util
+    ---------------
+    compare the header parser util.read_tiff_tags with PIL on written tifs.
+    Run from the repository root: python -m pytest tests
+"""
+
+import os
+import sys
+import numpy as np
+import pytest
+from PIL import Image
+from PIL.TiffImagePlugin import ImageFileDirectory_v2
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+from util import create_exif_tag, read_tiff_tags
+
+def _write_tif(path,mode):
+    data = np.arange(48*64,dtype=np.uint16).reshape(48,64)
+    img = Image.fromarray(data)
+    if mode!=img.mode:
+        img = Image.frombytes(mode,img.size,data.astype('>u2').tobytes())
+    tags = ImageFileDirectory_v2()
+    for tag,value in create_exif_tag('Allied Vision Pike','BayerGR16',
+                                     '2024:05:17 10:20:30.123',0.015,640,300,
+                                     fnumber=2.8).items():
+        tags[tag] = value
+    #UNDEFINED (7) and multiple valued tags
+    tags[37500] = b'\x00\x01maker note\xff'
+    tags.tagtype[37500] = 7
+    tags[36864] = b'0230'
+    tags.tagtype[36864] = 7
+    tags[530] = (2,2)
+    img.save(path,tiffinfo=tags)
+
+@pytest.mark.parametrize('mode',['I;16','I;16B'])
+def test_read_tiff_tags_matches_pil(tmp_path,mode):
+    path = str(tmp_path/'frame.tif')
+    _write_tif(path,mode)
+    expected = dict(Image.open(path).tag_v2)
+    tags = read_tiff_tags(path)
+    assert tags.keys()==expected.keys()
+    for tag,value in expected.items():
+        assert tags[tag]==value, tag
+    assert isinstance(tags[37500],bytes)
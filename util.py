@@ -4,130 +4,307 @@
 LASTIG, Univ. Gustave Eiffel, ENSG, IGN, F-94160 Saint-Mandé, France
 """
 
+import os
+import re
+import glob
+import struct
+import functools
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from PIL import Image,ExifTags
 
-def debayer_sub(data):
+#(y,x) position of r,g1,g2,b in the 2x2 bayer cell,
+#g1 is the green of the red rows, g2 the green of the blue rows
+_BAYER_SITES = {
+    'RGGB':((0,0),(0,1),(1,0),(1,1)),
+    'GRBG':((0,1),(0,0),(1,1),(1,0)),
+    'GBRG':((1,0),(1,1),(0,0),(0,1)),
+    'BGGR':((1,1),(1,0),(0,1),(0,0)),
+}
+#first two colors of PixelFormat names (BayerGR16,...) to pattern
+_BAYER_FORMATS = {'RG':'RGGB','GR':'GRBG','GB':'GBRG','BG':'BGGR'}
+
+def bayer_pattern(pattern):
+    '''
+    pattern name (RGGB, GRBG, GBRG, BGGR) of a pattern string, or of a
+    bayer pixel format: vimba PixelFormat or its name (e.g. 'BayerGR16')
+    '''
+    name = str(pattern).upper()
+    if name in _BAYER_SITES:
+        return name
+    if name.startswith('BAYER') and name[5:7] in _BAYER_FORMATS:
+        return _BAYER_FORMATS[name[5:7]]
+    raise ValueError('unknown bayer pattern {}'.format(pattern))
+
+def pixel_format_bits(pixel_format):
+    '''
+    bit depth of a bayer pixel format: vimba PixelFormat or its name
+    (e.g. 'BayerGR12' -> 12), None for a pattern string (e.g. 'GRBG')
+    '''
+    match = re.match(r'BAYER[A-Z]{2}(\d+)',str(pixel_format).upper())
+    return int(match.group(1)) if match else None
+
+@functools.lru_cache(maxsize=None)
+def _bayer_plan(pattern,odd_x,odd_y):
+    #sites of (r,g1,g2,b) and their plane slices, for an image whose origin
+    #is shifted by (odd_x,odd_y) from the origin of pattern
+    sites = tuple((y^odd_y,x^odd_x) for y,x in _BAYER_SITES[bayer_pattern(pattern)])
+    slices = tuple((Ellipsis,slice(y,None,2),slice(x,None,2)) for y,x in sites)
+    return sites,slices
+
+def _get_plan(pattern,offset):
+    return _bayer_plan(pattern,int(offset[0])%2,int(offset[1])%2)
+
+def debayer_sub_planes(data,copy=False,pattern='GRBG',offset=(0,0)):
+    '''# bayer planes by strided slicing
+    split the raw bayer image into its 4 color planes without interpolation.
+    The planes are strided views on data (no pixel is copied), unless copy
+    is True. data can be a stack of frames [...,nl,nc], e.g. a memmap.
+
+    Args:
+        data (TYPE): numpy array image raw data, [nl,nc] or [n,nl,nc]
+        copy (bool): if True, return C-contiguous copies instead of views
+        pattern (TYPE): bayer pattern string or PixelFormat, see bayer_pattern
+        offset (tuple): (offset_x,offset_y) of the image on the sensor,
+            an odd offset shifts the pattern
+
+    Returns:
+        tuple of half size numpy arrays (r,g1,g2,b)
+    '''
+    nl,nc = np.shape(data)[-2:]
+    data = data[...,:nl//2*2,:nc//2*2]
+    planes = tuple(data[sl] for sl in _get_plan(pattern,offset)[1])
+    if copy:
+        return tuple(np.ascontiguousarray(p) for p in planes)
+    return planes
+
+def debayer_sub(data,pattern='GRBG',offset=(0,0)):
     '''# debayer by sub sampling
     debayer without interpolation
  
     Args:
-        data (TYPE): numpy array image raw data
+        data (TYPE): numpy array image raw data, [nl,nc] or [n,nl,nc]
+        pattern (TYPE): bayer pattern string or PixelFormat, see bayer_pattern
+        offset (tuple): (offset_x,offset_y) of the image on the sensor
 
     Returns:
         half size r,g1,g2,b image
         3 dimension numpy array: [ny,nx,nb],for(r,g1,g2,b)
+        ([n,ny,nx,nb] for a stack)
     '''
-    nl,nc = np.shape(data)
-    nl = int(nl/2)
-    nc = int(nc/2)
-    l0 = [[0]]
-    l1 = [[1]]
-    for x in np.arange(nl-1):
-        l0.append([x*2+2])
-        l1.append([x*2+3])
-    c0 = np.arange(nc)*2
-    c1 = np.arange(nc)*2+1
-    
-    data1 = np.empty([nl,nc,4],data.dtype)
-    data1[:,:,0] = data[l0,c1]  #r
-    data1[:,:,1] = data[l0,c0]  #g1
-    data1[:,:,2] = data[l1,c1]  #g2
-    data1[:,:,3] = data[l1,c0]  #b
+    planes = debayer_sub_planes(data,pattern=pattern,offset=offset)
+    
+    data1 = np.empty(planes[0].shape+(4,),data.dtype)
+    for i,plane in enumerate(planes):
+        data1[...,i] = plane
     
     return data1
 
-def debayer_sub_rgb(data):
-    deb_sub = debayer_sub(data)
-    ny,nx,_ = deb_sub.shape
-    rgb = np.empty([ny,nx,3],dtype=data.dtype)
-    rgb[:,:,0] = deb_sub[:,:,0]
-    rgb[:,:,1] = deb_sub[:,:,1]*0.5+deb_sub[:,:,2]*0.5
-    rgb[:,:,2] = deb_sub[:,:,3]
+def _run_tiled(func,data,out,tile_rows,workers,halo=0,scale=1):
+    '''
+    run func(data_band,out_band) on row bands of data, on a thread pool.
+    tile_rows is rounded to an even number, so each band starts on the same
+    bayer phase as the frame. halo rows are added on each side of a band and
+    dropped from its result, scale is the ratio between data and out rows.
+    For a stack of frames, a band holds the same rows of all frames.
+    '''
+    nl = np.shape(data)[-2]
+    tile_rows = max(2,int(tile_rows)//2*2)
+    
+    def run(y0):
+        y1 = min(y0+tile_rows,nl)
+        if not halo:
+            func(data[...,y0:y1,:],out[...,y0//scale:y1//scale,:,:])
+            return
+        h0 = max(y0-halo,0)
+        h1 = min(y1+halo,nl)
+        band = np.empty(out.shape[:-3]+(h1-h0,)+out.shape[-2:],dtype=out.dtype)
+        func(data[...,h0:h1,:],band)
+        out[...,y0//scale:y1//scale,:,:] = band[...,(y0-h0)//scale:(y1-h0)//scale,:,:]
+    
+    starts = range(0,nl,tile_rows)
+    if workers>1 and len(starts)>1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(run,starts))
+    else:
+        for y0 in starts:
+            run(y0)
+    return out
+
+#number of pixels per call when a stack is processed without tiles, so the
+#temporaries of a call stay in cache for large frames while small frames
+#are still processed many at a time
+_STACK_CHUNK_PIXELS = 1<<20
+
+def _run_stack(func,data,out):
+    '''run func(data_chunk,out_chunk) on chunks of frames of a stack'''
+    n = np.shape(data)[0]
+    step = max(1,_STACK_CHUNK_PIXELS//int(np.prod(np.shape(data)[1:])))
+    for i in range(0,n,step):
+        func(data[i:i+step],out[i:i+step])
+    return out
+
+def _default_tile_rows(nl,tile_rows,workers):
+    if tile_rows is None and workers>1:
+        #one band per worker
+        tile_rows = -(-nl//(2*workers))*2
+    return tile_rows
+
+def _debayer_sub_rgb(data,rgb,pattern='GRBG',offset=(0,0),scale=1.):
+    r,g1,g2,b = debayer_sub_planes(data,pattern=pattern,offset=offset)
+    if rgb.dtype.kind=='f':
+        scale = rgb.dtype.type(scale)
+        np.multiply(r,scale,out=rgb[...,0])
+        np.add(g1,g2,out=rgb[...,1],dtype=rgb.dtype)
+        rgb[...,1] *= scale*rgb.dtype.type(0.5)
+        np.multiply(b,scale,out=rgb[...,2])
+    else:
+        rgb[...,0] = r
+        #(g1+g2)>>1 in uint32, shifted straight into the output
+        g = np.add(g1,g2,dtype=np.uint32)
+        np.right_shift(g,1,out=rgb[...,1],casting='unsafe')
+        rgb[...,2] = b
     return rgb
 
-def debayer_full(data):
-    nl,nc = np.shape(data)
-    l0 = [[0]]
-    l1 = [[1]]
-    for x in np.arange(int(nl/2)-1):
-        l0.append([x*2+2])
-        l1.append([x*2+3])
-    c0 = np.arange(int(nc/2))*2
-    c1 = np.arange(int(nc/2))*2+1
-    
-    r = np.empty([nl,nc],dtype=np.float32)
-    g = np.empty([nl,nc],dtype=np.float32)
-    b = np.empty([nl,nc],dtype=np.float32)
-    g[l0,c0] = data[l0,c0].astype(np.float32) #g1
-    r[l0,c1] = data[l0,c1].astype(np.float32)
-    b[l1,c0] = data[l1,c0].astype(np.float32)
-    g[l1,c1] = data[l1,c1].astype(np.float32) #g2
-    
-    #les 4 cones
-    r[0,0] = r[0,1]
-    b[0,0] = b[1,0]
-    g[0,nc-1] = (g[0,nc-2]+g[1,nc-1])/2
-    b[0,nc-1] = b[1,nc-2]
-    r[nl-1,0] = r[nl-2,1]
-    g[nl-1,0] = (g[nl-2,0]+g[nl-1,1])/2
-    r[nl-1,nc-1] = r[nl-2,nc-1]
-    b[nl-1,nc-1] = b[nl-1,nc-2]
-            
-    #permier ligne
-    g[0,1:nc-2:2] = (g[0,0:nc-3:2]+g[0,2:nc-1:2]+g[1,1:nc-2:2])/3
-    b[0,1:nc-2:2] = (b[1,0:nc-3:2]+b[1,2:nc-1:2])/2
-    r[0,2:nc-1:2] = (r[0,1:nc-2:2]+r[0,3:nc:2])/2
-    b[0,2:nc-1:2] = b[1,2:nc-1:2]
-    #dernier ligne
-    r[nl-1,1:nc-2:2] = r[nl-2,1:nc-2:2]
-    b[nl-1,1:nc-2:2] = (b[nl-1,0:nc-3:2]+b[nl-1,2:nc-1:2])/2
-    r[nl-1,2:nc-1:2] = (r[nl-2,1:nc-2:2]+r[nl-2,3:nc:2])/2
-    g[nl-1,2:nc-1:2] = (g[nl-1,1:nc-2:2]+g[nl-1,3:nc:2]+g[nl-2,2:nc-1:2])/3
-    #permier colonne
-    r[1:nl-2:2,0] = 0.5*(r[0:nl-3:2,1]+r[2:nl-1:2,1])
-    g[1:nl-2:2,0] = (g[0:nl-3:2,0]+g[2:nl-1:2,0]+g[1:nl-2:2,1])/3
-    r[2:nl-1:2,0] = r[2:nl-1:2,1]
-    b[2:nl-1:2,0] = (b[1:nl-2:2,0]+b[3:nl:2,0])/2
-    #dernier colonne
-    r[1:nl-2:2,nc-1] = (r[0:nl-3:2,nc-1]+r[2:nl-1:2,nc-1])/2
-    b[1:nl-2:2,nc-1] = b[1:nl-2:2,nc-2]
-    g[2:nl-1:2,nc-1] = (g[1:nl-2:2,nc-1]+g[3:nl:2,nc-1]+g[2:nl-1:2,nc-2])/3
-    b[2:nl-1:2,nc-1] = (b[1:nl-2:2,nc-2]+b[3:nl:2,nc-2])/2   
-    #filtre rouge
-    g[2:nl-1:2,1:nc-2:2] = (g[1:nl-2:2,1:nc-2:2]+\
-                            g[3:nl:2  ,1:nc-2:2]+\
-                            g[2:nl-1:2,0:nc-3:2]+\
-                            g[2:nl-1:2,2:nc-1:2])/4
-    b[2:nl-1:2,1:nc-2:2] = (b[1:nl-2:2,0:nc-3:2]+\
-                            b[1:nl-2:2,2:nc-1:2]+\
-                            b[3:nl:2  ,0:nc-3:2]+\
-                            b[3:nl:2  ,2:nc-1:2])/4
-         
-    #filtre vert1(ligne paire, colonne paire)
-    r[2:nl-1:2,2:nc-1:2] = (r[2:nl-1:2,1:nc-2:2]+r[2:nl-1:2,3:nc:2])/2
-    b[2:nl-1:2,2:nc-1:2] = (b[1:nl-2:2,2:nc-1:2]+b[3:nl:2,2:nc-1:2])/2
-        
-    #filtre vert2(ligne impaire, colonne impaire)
-    r[1:nl-2:2,1:nc-2:2] = (r[0:nl-3:2,1:nc-2:2]+r[2:nl-1:2,1:nc-2:2])/2
-    b[1:nl-2:2,1:nc-2:2] = (b[1:nl-2:2,0:nc-3:2]+b[1:nl-2:2,2:nc-1:2])/2
+def debayer_sub_rgb(data,out=None,tile_rows=None,workers=1,pattern='GRBG',offset=(0,0),
+                    radiometric=False,bits=None):
+    '''# debayer by sub sampling to rgb
+    half size rgb image, green is the mean of g1 and g2, computed in integer
+    (rounded down) for integer outputs.
+    With radiometric, the output is float scaled to [0,1] by the bit depth.
+    A stack of frames [n,nl,nc] is processed in one call.
+
+    Args:
+        data (TYPE): numpy array image raw data, [nl,nc] or [n,nl,nc]
+        out (TYPE): optional output array [nl/2,nc/2,3] ([n,nl/2,nc/2,3])
+        tile_rows (int): if given, process data by bands of tile_rows rows
+        workers (int): number of threads processing the bands
+        pattern (TYPE): bayer pattern string or PixelFormat, see bayer_pattern
+        offset (tuple): (offset_x,offset_y) of the image on the sensor
+        radiometric (bool): if True, return float values divided by 2**bits-1,
+            out must be a float array
+        bits (int): bit depth of data for radiometric, taken from pattern if
+            it is a pixel format (e.g. 'BayerGR12'), required otherwise
+
+    Returns:
+        3 dimension numpy array: [ny,nx,3] ([n,ny,nx,3] for a stack)
+    '''
+    nl,nc = np.shape(data)[-2:]
+    scale = 1.
+    if radiometric:
+        if bits is None:
+            bits = pixel_format_bits(pattern)
+        if bits is None:
+            raise ValueError('bits is required with radiometric for pattern {}'.format(pattern))
+        if out is not None and out.dtype.kind!='f':
+            raise ValueError('radiometric output must be float, not {}'.format(out.dtype))
+        scale = 1./(2**bits-1)
+    shape = np.shape(data)[:-2]+(nl//2,nc//2,3)
+    if out is None:
+        dtype = np.float32 if radiometric else data.dtype.newbyteorder('=')
+        out = np.empty(shape,dtype=dtype)
+    elif out.shape!=shape:
+        raise ValueError('out shape {} must be {}'.format(out.shape,shape))
+    tile_rows = _default_tile_rows(nl,tile_rows,workers)
+    func = functools.partial(_debayer_sub_rgb,pattern=pattern,offset=offset,scale=scale)
+    if tile_rows is None:
+        if np.ndim(data)>2:
+            return _run_stack(func,data,out)
+        return func(data,out)
+    return _run_tiled(func,data[...,:nl//2*2,:],out,tile_rows,workers,scale=2)
+
+def _avg2(a,b):
+    if a.dtype.kind=='f':
+        return (a+b)*0.5
+    return (a+b+1)>>1
+
+def _avg4(a,b,c,d):
+    if a.dtype.kind=='f':
+        return (a+b+c+d)*0.25
+    return (a+b+c+d+2)>>2
+
+def debayer_full(data,dtype=None,out=None,tile_rows=None,workers=1,pattern='GRBG',
+                 offset=(0,0)):
+    '''# debayer by bilinear interpolation
+    full size demosaic of a raw bayer image. The border is handled by a
+    mirror padding of one pixel, which keeps the bayer pattern, so every
+    pixel is interpolated the same way in a fixed number of slicing passes.
+    Integer outputs are computed in uint32 and rounded, float outputs are
+    computed in float32.
+    With tile_rows, the image is processed by bands of rows with a halo of
+    2 rows, on workers threads. Only one band is padded and widened at a time
+    per worker, the result is identical to the single band processing.
+    A stack of frames [n,nl,nc] is processed in one call.
+
+    Args:
+        data (TYPE): numpy array image raw data, [nl,nc] or [n,nl,nc]
+        dtype (TYPE): output data type, data.dtype in native byte order if None
+            (e.g. np.float32)
+        out (TYPE): optional output array [nl,nc,3] ([n,nl,nc,3]), its dtype is used
+        tile_rows (int): if given, process data by bands of tile_rows rows
+        workers (int): number of threads processing the bands
+        pattern (TYPE): bayer pattern string or PixelFormat, see bayer_pattern
+        offset (tuple): (offset_x,offset_y) of the image on the sensor
+
+    Returns:
+        full size rgb image
+        3 dimension numpy array: [nl,nc,3] ([n,nl,nc,3] for a stack)
+    '''
+    shape = np.shape(data)+(3,)
+    nl = shape[-3]
+    if out is None:
+        out = np.empty(shape,dtype=data.dtype.newbyteorder('=') if dtype is None else dtype)
+    elif out.shape!=shape:
+        raise ValueError('out shape {} must be {}'.format(out.shape,shape))
+    tile_rows = _default_tile_rows(nl,tile_rows,workers)
+    func = functools.partial(_debayer_full,pattern=pattern,offset=offset)
+    if tile_rows is None:
+        if np.ndim(data)>2:
+            return _run_stack(func,data,out)
+        return func(data,out)
+    return _run_tiled(func,data,out,tile_rows,workers,halo=2)
+
+def _debayer_full(data,out,pattern='GRBG',offset=(0,0)):
+    nl,nc = np.shape(data)[-2:]
+    (r,g1,g2,b),slices = _get_plan(pattern,offset)
+    work = np.float32 if out.dtype.kind=='f' else np.uint32
+    pad = [(0,0)]*(np.ndim(data)-2)+[(1,1),(1,1)]
+    p = np.pad(data,pad,mode='reflect').astype(work)
+    
+    def nb(y,x,dy,dx):
+        #neighbour (dy,dx) of all the pixels of the site (y,x)
+        return p[...,1+y+dy:1+nl+dy:2,1+x+dx:1+nc+dx:2]
+    
+    def cross(y,x):
+        return _avg4(nb(y,x,-1,0),nb(y,x,1,0),nb(y,x,0,-1),nb(y,x,0,1))
     
+    def diag(y,x):
+        return _avg4(nb(y,x,-1,-1),nb(y,x,-1,1),nb(y,x,1,-1),nb(y,x,1,1))
+    
+    def horiz(y,x):
+        return _avg2(nb(y,x,0,-1),nb(y,x,0,1))
+    
+    def vert(y,x):
+        return _avg2(nb(y,x,-1,0),nb(y,x,1,0))
+    
+    #filtre rouge
+    out[slices[0]+(0,)] = data[slices[0]]
+    out[slices[0]+(1,)] = cross(*r)
+    out[slices[0]+(2,)] = diag(*r)
+    #filtre vert1, ligne rouge
+    out[slices[1]+(0,)] = horiz(*g1)
+    out[slices[1]+(1,)] = data[slices[1]]
+    out[slices[1]+(2,)] = vert(*g1)
+    #filtre vert2, ligne bleu
+    out[slices[2]+(0,)] = vert(*g2)
+    out[slices[2]+(1,)] = data[slices[2]]
+    out[slices[2]+(2,)] = horiz(*g2)
     #filtre bleu
-    r[1:nl-2:2,2:nc-1:2] = (r[0:nl-3:2,1:nc-2:2]+\
-                            r[2:nl-1:2,  3:nc:2]+\
-                            r[0:nl-3:2,1:nc-2:2]+\
-                            r[2:nl-1:2,  3:nc:2])/4
-    g[1:nl-2:2,2:nc-1:2] = (g[1:nl-2:2,1:nc-2:2]+\
-                            g[1:nl-2:2,  3:nc:2]+\
-                            g[0:nl-3:2,2:nc-1:2]+\
-                            g[2:nl-1:2,2:nc-1:2])/4
-            
-    rgb = np.empty([nl,nc,3],dtype=data.dtype)
-    rgb[:,:,0] = r
-    rgb[:,:,1] = g
-    rgb[:,:,2] = b    
+    out[slices[3]+(0,)] = diag(*b)
+    out[slices[3]+(1,)] = cross(*b)
+    out[slices[3]+(2,)] = data[slices[3]]
     
-    return rgb
+    return out
 
 def create_exif_tag(camera_name,pixel_format,datetime,exposure_time,offset_x,offset_y,
                     fnumber=-1,description="Description d'image"):
@@ -138,11 +315,11 @@ def create_exif_tag(camera_name,pixel_format,datetime,exposure_time,offset_x,off
     '''
     tag = {}
     tag[270] = description
-    tag[271] = cam_name
+    tag[271] = camera_name
     tag[272] = str(pixel_format)
     tag[306] = datetime
     tag[33434] = exposure_time # s
-    tag[33437] = fn
+    tag[33437] = fnumber
     tag[1000] = offset_x
     tag[1001] = offset_y
     return tag
@@ -186,22 +363,262 @@ def convert_selected_tags_to_dict(tags):
          
     return ordered_tags_dict
 
-def read_exif_tags(srcfile,show=False):
-    tags = Image.open(srcfile).tag_v2
+#tiff field types: struct format of one value (rational: 2 values)
+#ASCII (2) and UNDEFINED (7) values are read as one byte string
+_TIFF_TYPES = {1:'B',2:'s',3:'H',4:'L',5:'LL',6:'b',7:'s',8:'h',9:'l',10:'ll',
+               11:'f',12:'d'}
+#tags returned as tuple by PIL even with a single value
+_TIFF_TUPLE_TAGS = (258,273,279)
+_TIFF_HEAD_SIZE = 4096
+
+def read_tiff_tags(srcfile):
+    '''
+    read the tags of the first IFD of a tif file, by parsing the header with
+    struct, the pixel data is not read.
+    values are decoded like PIL tag_v2: str for ASCII, bytes for UNDEFINED,
+    float for rationals, a tuple for multiple values.
+    raise ValueError if srcfile is not a (classic) tiff file.
+    '''
+    return _parse_tiff(srcfile)[1]
+
+def _parse_tiff(srcfile):
+    #byte order ('<' or '>') and tags of the first IFD
+    with open(srcfile,'rb') as f:
+        head = f.read(_TIFF_HEAD_SIZE)
+        
+        def read(offset,size):
+            if offset+size<=len(head):
+                return head[offset:offset+size]
+            f.seek(offset)
+            return f.read(size)
+        
+        if head[:2]==b'II':
+            bo = '<'
+        elif head[:2]==b'MM':
+            bo = '>'
+        else:
+            raise ValueError('{} is not a tiff file'.format(srcfile))
+        magic,ifd = struct.unpack(bo+'HL',head[2:8])
+        if magic!=42:
+            raise ValueError('{} is not a classic tiff file'.format(srcfile))
+        n, = struct.unpack(bo+'H',read(ifd,2))
+        entries = read(ifd+2,12*n)
+        tags = {}
+        for i in range(n):
+            tag,typ,count = struct.unpack(bo+'HHL',entries[i*12:i*12+8])
+            if typ not in _TIFF_TYPES:
+                continue
+            fmt = bo+_TIFF_TYPES[typ]*count if typ not in (2,7) else bo+str(count)+'s'
+            size = struct.calcsize(fmt)
+            if size<=4:
+                raw = entries[i*12+8:i*12+8+size]
+            else:
+                raw, = struct.unpack(bo+'L',entries[i*12+8:i*12+12])
+                raw = read(raw,size)
+            values = struct.unpack(fmt,raw)
+            if typ==2:
+                value = values[0].split(b'\0',1)[0].decode('utf-8','replace')
+            elif typ==7:
+                value = values[0]
+            else:
+                if typ in (5,10):
+                    values = tuple(num/den if den else float('nan')
+                                   for num,den in zip(values[0::2],values[1::2]))
+                value = values if (len(values)>1 or tag in _TIFF_TUPLE_TAGS) else values[0]
+            tags[tag] = value
+    return bo,tags
+
+def _read_tags(srcfile,fast):
+    if fast:
+        try:
+            return read_tiff_tags(srcfile)
+        except (ValueError,struct.error):
+            pass
+    return Image.open(srcfile).tag_v2
+
+def read_exif_tags(srcfile,show=False,fast=True):
+    '''
+    read the tags of a tif file, by the header parser read_tiff_tags if fast,
+    or if the file can not be parsed by it, by PIL.
+    '''
+    tags = _read_tags(srcfile,fast)
     tags_dict = convert_tags_to_dict(tags)
     if show:
         for name,val in tags_dict.items():
             print(name,':',val)
     return tags_dict
 
-def read_exif_selected_tags(srcfile,show=False):
-    
-    tags = Image.open(srcfile).tag_v2
+def read_exif_selected_tags(srcfile,show=False,fast=True):
+    '''
+    read the selected tags of a tif file, see read_exif_tags for fast
+    '''
+    tags = _read_tags(srcfile,fast)
     selected_tags_dict = convert_selected_tags_to_dict(tags)
     if show:
         for name,val in selected_tags_dict.items():
             print(name,':',val)
     return selected_tags_dict
+
+def scan_exif_selected_tags(srcpath,pattern='*.tif',workers=8,fast=True):
+    '''
+    read the selected tags of all the files matching pattern in srcpath,
+    on a thread pool.
+    files that can not be read are reported and skipped.
+
+    Returns:
+        dict {file:selected tags dict}, files in sorted order
+    '''
+    srcfiles = sorted(glob.glob(os.path.join(srcpath,pattern)))
+    
+    def read(srcfile):
+        try:
+            return read_exif_selected_tags(srcfile,fast=fast)
+        except Exception as e:
+            print('error reading tags of {}: {}'.format(srcfile,e))
+            return None
+    
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(read,srcfiles))
+    return {srcfile:tags for srcfile,tags in zip(srcfiles,results) if tags is not None}
     
-def read_rgb_sub(srcfile):
-    return debayer_sub_rgb(np.asarray(Image.open(srcfile)))
\ No newline at end of file
+def _try_parse_tiff(srcfile):
+    #(byte order,tags) of srcfile, None if the header parser can not read it
+    try:
+        return _parse_tiff(srcfile)
+    except (ValueError,struct.error):
+        return None
+
+def _raw_layout(parsed):
+    #(offset,dtype,shape) of the pixel data of an uncompressed single channel
+    #tif whose strips are contiguous, None if it can not be memory-mapped.
+    #parsed: (byte order,tags) returned by _try_parse_tiff
+    if parsed is None:
+        return None
+    bo,tags = parsed
+    bits = tags.get(258,(1,))
+    if (tags.get(259,1)!=1 or tags.get(277,1)!=1 or tags.get(339,1)!=1
+        or len(bits)!=1 or bits[0] not in (8,16,32) or 273 not in tags
+        or 279 not in tags or 322 in tags):
+        return None
+    shape = (tags[257],tags[256])
+    dtype = np.dtype(bo+'u'+str(bits[0]//8))
+    offsets,counts = tags[273],tags[279]
+    for i in range(1,len(offsets)):
+        if offsets[i]!=offsets[i-1]+counts[i-1]:
+            return None
+    if sum(counts)<shape[0]*shape[1]*dtype.itemsize:
+        return None
+    return offsets[0],dtype,shape
+
+def read_raw(srcfile,mmap=True):
+    '''
+    read the raw data [nl,nc] of a tif file.
+    if mmap, the uncompressed single channel files written by vimba_util are
+    mapped read-only with numpy.memmap, the pixels are read from the disk
+    only when accessed. compressed, tiled or multi-channel files, or all
+    files if not mmap, are decoded by PIL.
+    a memmap keeps the byte order of the file: a big-endian ('MM') file is
+    mapped as '>u2', which makes every numpy operation on it slower, use
+    mmap=False or .astype('=u2') to work on it. decoded data, the frames of
+    RawStack and read_raw_stack and the debayer outputs are in native byte
+    order.
+    '''
+    return _read_raw(srcfile,_try_parse_tiff(srcfile) if mmap else None)
+
+def _read_raw(srcfile,parsed):
+    layout = _raw_layout(parsed)
+    if layout is None:
+        data = np.asarray(Image.open(srcfile))
+        return data.astype(data.dtype.newbyteorder('='),copy=False)
+    offset,dtype,shape = layout
+    return np.memmap(srcfile,dtype=dtype,mode='r',offset=offset,shape=shape)
+
+class RawStack():
+    '''
+    lazy stack [n,nl,nc] of raw tif files of the same shape.
+    nothing is read before indexing, and indexing reads only the requested
+    frames and pixels (files mapped by read_raw), e.g. stack[:,y0:y1,x0:x1]
+    is the ROI of all the frames. np.asarray(stack) reads the whole stack.
+    '''
+    def __init__(self,srcfiles,mmap=True):
+        self.srcfiles = list(srcfiles)
+        self.mmap = mmap
+        first = read_raw(self.srcfiles[0],mmap)
+        self.shape = (len(self.srcfiles),)+first.shape
+        self.dtype = first.dtype.newbyteorder('=')
+        self.ndim = 3
+
+    def __len__(self):
+        return len(self.srcfiles)
+
+    def frame(self,i):
+        '''
+        raw data of frame i, see read_raw
+        '''
+        data = read_raw(self.srcfiles[i],self.mmap)
+        if data.shape!=self.shape[1:]:
+            raise ValueError('{} has shape {}, expected {}'.format(
+                self.srcfiles[i],data.shape,self.shape[1:]))
+        return data
+
+    def __getitem__(self,key):
+        if not isinstance(key,tuple):
+            key = (key,)
+        if key and key[0] is Ellipsis:
+            key = (slice(None),)+key
+        index,roi = (key[0],key[1:]) if key else (slice(None),())
+        if isinstance(index,(int,np.integer)):
+            return np.array(self.frame(index)[roi],dtype=self.dtype)
+        indices = np.arange(len(self))[index]
+        out = None
+        for n,i in enumerate(indices):
+            data = self.frame(i)[roi]
+            if out is None:
+                out = np.empty((len(indices),)+data.shape,dtype=self.dtype)
+            out[n] = data
+        if out is None:
+            out = np.empty((0,)+np.empty(self.shape[1:],dtype=self.dtype)[roi].shape,
+                           dtype=self.dtype)
+        return out
+
+    def __array__(self,dtype=None,copy=None):
+        #the frames are always read into a new array
+        if copy is False:
+            raise ValueError('a RawStack can not be converted to an array without a copy')
+        return np.asarray(self[:],dtype=dtype)
+
+def read_rgb_sub(srcfile,pattern=None,mmap=True):
+    '''
+    read a raw tif (see read_raw) and debayer it by sub sampling.
+    if pattern is None, the bayer pattern and the offset are taken from the
+    pixel_format and offset_x,offset_y tags, GRBG if the format is not bayer.
+    '''
+    offset = (0,0)
+    #the header is parsed once for the tags and the memory-mapped layout
+    parsed = _try_parse_tiff(srcfile) if (mmap or pattern is None) else None
+    if pattern is None:
+        tags = parsed[1] if parsed is not None else Image.open(srcfile).tag_v2
+        pattern = str(tags.get(272,''))
+        if not pattern.upper().startswith('BAYER'):
+            pattern = 'GRBG'
+        offset = (tags.get(1000,0),tags.get(1001,0))
+    data = _read_raw(srcfile,parsed if mmap else None)
+    return debayer_sub_rgb(data,pattern=pattern,offset=offset)
+
+def read_raw_stack(srcfiles,out=None,mmap=True):
+    '''
+    read raw tif files of the same shape into a stack [n,nl,nc], which the
+    debayer functions process in one call.
+    out can be a preallocated array or a numpy.memmap, for sequences that
+    do not fit in memory. see RawStack to read ROIs without loading the
+    full frames.
+    srcfiles can be any iterable of file names, e.g. glob.iglob.
+    '''
+    #the number of frames is needed to allocate out
+    srcfiles = list(srcfiles)
+    for i,srcfile in enumerate(srcfiles):
+        data = read_raw(srcfile,mmap)
+        if out is None:
+            out = np.empty((len(srcfiles),)+data.shape,dtype=data.dtype.newbyteorder('='))
+        out[i] = data
+    return out
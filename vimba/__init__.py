@@ -28,6 +28,8 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 # Suppress 'imported but unused' - Error from static style checker.
 # flake8: noqa: F401
 
+import importlib
+
 __version__ = '1.2.0'
 
 __all__ = [
@@ -37,12 +39,14 @@ __all__ = [
     'CameraEvent',
     'AccessMode',
     'PersistType',
+    'OverflowPolicy',
     'Interface',
     'InterfaceType',
     'InterfaceChangeHandler',
     'InterfaceEvent',
     'PixelFormat',
     'Frame',
+    'FramePool',
     'FeatureTypes',
     'FrameHandler',
     'FrameStatus',
@@ -94,35 +98,65 @@ __all__ = [
     'LOG_CONFIG_CRITICAL_CONSOLE_ONLY',
     'LOG_CONFIG_CRITICAL_FILE_ONLY',
     'LOG_CONFIG_CRITICAL',
+    'NativeCallStats',
 
     'TraceEnable',
     'ScopedLogEnable',
     'RuntimeTypeCheckEnable'
 ]
 
-# Import everything exported from the top level module
-from .vimba import Vimba
+# Everything exported from the top level module is imported from its submodule on first
+# access (PEP 562), so "import vimba" neither imports all submodules nor needs the Vimba
+# installation. The native libraries are loaded on the first call into them.
+_LAZY_IMPORTS = {
+    '.vimba': ('Vimba',),
+
+    '.camera': ('AccessMode', 'PersistType', 'OverflowPolicy', 'Camera', 'CameraChangeHandler',
+                'CameraEvent', 'FrameHandler'),
+
+    '.interface': ('Interface', 'InterfaceType', 'InterfaceChangeHandler', 'InterfaceEvent'),
+
+    '.frame': ('PixelFormat', 'Frame', 'FramePool', 'Debayer', 'intersect_pixel_formats',
+               'MONO_PIXEL_FORMATS', 'BAYER_PIXEL_FORMATS', 'RGB_PIXEL_FORMATS',
+               'RGBA_PIXEL_FORMATS', 'BGR_PIXEL_FORMATS', 'BGRA_PIXEL_FORMATS',
+               'YUV_PIXEL_FORMATS', 'YCBCR_PIXEL_FORMATS', 'COLOR_PIXEL_FORMATS',
+               'OPENCV_PIXEL_FORMATS', 'FrameStatus', 'FeatureTypes', 'AllocationMode'),
+
+    '.error': ('VimbaSystemError', 'VimbaCameraError', 'VimbaInterfaceError', 'VimbaFeatureError',
+               'VimbaFrameError', 'VimbaTimeout'),
+
+    '.feature': ('IntFeature', 'FloatFeature', 'StringFeature', 'BoolFeature', 'EnumEntry',
+                 'EnumFeature', 'CommandFeature', 'RawFeature'),
+
+    '.util': ('Log', 'LogLevel', 'LogConfig', 'LOG_CONFIG_TRACE_CONSOLE_ONLY',
+              'LOG_CONFIG_TRACE_FILE_ONLY', 'LOG_CONFIG_TRACE', 'LOG_CONFIG_INFO_CONSOLE_ONLY',
+              'LOG_CONFIG_INFO_FILE_ONLY', 'LOG_CONFIG_INFO', 'LOG_CONFIG_WARNING_CONSOLE_ONLY',
+              'LOG_CONFIG_WARNING_FILE_ONLY', 'LOG_CONFIG_WARNING', 'LOG_CONFIG_ERROR_CONSOLE_ONLY',
+              'LOG_CONFIG_ERROR_FILE_ONLY', 'LOG_CONFIG_ERROR', 'LOG_CONFIG_CRITICAL_CONSOLE_ONLY',
+              'LOG_CONFIG_CRITICAL_FILE_ONLY', 'LOG_CONFIG_CRITICAL', 'ScopedLogEnable',
+              'TraceEnable', 'RuntimeTypeCheckEnable', 'NativeCallStats')
+}
+
+_LAZY_NAMES = {name: module for module, names in _LAZY_IMPORTS.items() for name in names}
+_LAZY_MODULES = {module[1:] for module in _LAZY_IMPORTS}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_MODULES:
+        # Importing a submodule binds it in the package namespace
+        return importlib.import_module('.' + name, __name__)
 
-from .camera import AccessMode, PersistType, Camera, CameraChangeHandler, CameraEvent, FrameHandler
+    module = _LAZY_NAMES.get(name)
 
-from .interface import Interface, InterfaceType, InterfaceChangeHandler, InterfaceEvent
+    if module is None:
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
 
-from .frame import PixelFormat, Frame, Debayer, intersect_pixel_formats, MONO_PIXEL_FORMATS, \
-                   BAYER_PIXEL_FORMATS, RGB_PIXEL_FORMATS, RGBA_PIXEL_FORMATS, BGR_PIXEL_FORMATS, \
-                   BGRA_PIXEL_FORMATS, YUV_PIXEL_FORMATS, YCBCR_PIXEL_FORMATS, \
-                   COLOR_PIXEL_FORMATS, OPENCV_PIXEL_FORMATS, FrameStatus, FeatureTypes, \
-                   AllocationMode
+    value = getattr(importlib.import_module(module, __name__), name)
 
-from .error import VimbaSystemError, VimbaCameraError, VimbaInterfaceError, VimbaFeatureError, \
-                   VimbaFrameError, VimbaTimeout
+    # Cache the value, later accesses do not go through __getattr__
+    globals()[name] = value
+    return value
 
-from .feature import IntFeature, FloatFeature, StringFeature, BoolFeature, EnumEntry, EnumFeature, \
-                     CommandFeature, RawFeature
 
-from .util import Log, LogLevel, LogConfig, LOG_CONFIG_TRACE_CONSOLE_ONLY, \
-                  LOG_CONFIG_TRACE_FILE_ONLY, LOG_CONFIG_TRACE, LOG_CONFIG_INFO_CONSOLE_ONLY, \
-                  LOG_CONFIG_INFO_FILE_ONLY, LOG_CONFIG_INFO, LOG_CONFIG_WARNING_CONSOLE_ONLY, \
-                  LOG_CONFIG_WARNING_FILE_ONLY, LOG_CONFIG_WARNING, LOG_CONFIG_ERROR_CONSOLE_ONLY, \
-                  LOG_CONFIG_ERROR_FILE_ONLY, LOG_CONFIG_ERROR, LOG_CONFIG_CRITICAL_CONSOLE_ONLY, \
-                  LOG_CONFIG_CRITICAL_FILE_ONLY, LOG_CONFIG_CRITICAL, ScopedLogEnable, \
-                  TraceEnable, RuntimeTypeCheckEnable
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_NAMES) | _LAZY_MODULES)
@@ -76,9 +76,9 @@ __all__ = [
     'VmbFrame',
     'VmbFeaturePersistSettings',
     'G_VIMBA_C_HANDLE',
-    'VIMBA_C_VERSION',
     'EXPECTED_VIMBA_C_VERSION',
     'call_vimba_c',
+    'vmb',
     'build_callback_type',
 
     # Exports from vimba_image_transform
@@ -86,9 +86,9 @@ __all__ = [
     'VmbImageInfo',
     'VmbDebayerMode',
     'VmbTransformInfo',
-    'VIMBA_IMAGE_TRANSFORM_VERSION',
     'EXPECTED_VIMBA_IMAGE_TRANSFORM_VERSION',
     'call_vimba_image_transform',
+    'vmb_transform',
     'PIXEL_FORMAT_TO_LAYOUT',
     'LAYOUT_TO_PIXEL_FORMAT',
     'PIXEL_FORMAT_CONVERTIBILITY_MAP',
@@ -108,13 +108,28 @@ from .vimba_c import VmbInterface, VmbAccessMode, VmbFeatureData, \
                    VmbFeaturePersist, VmbFeatureVisibility, VmbFeatureFlags, VmbFrameStatus, \
                    VmbFrameFlags, VmbVersionInfo, VmbInterfaceInfo, VmbCameraInfo, VmbFeatureInfo, \
                    VmbFeatureEnumEntry, VmbFrame, VmbFeaturePersistSettings, \
-                   G_VIMBA_C_HANDLE, EXPECTED_VIMBA_C_VERSION, VIMBA_C_VERSION, call_vimba_c, \
+                   G_VIMBA_C_HANDLE, EXPECTED_VIMBA_C_VERSION, call_vimba_c, vmb, \
                    build_callback_type
 
 from .vimba_image_transform import VmbImage, VmbImageInfo, VmbDebayerMode, \
-                                   VIMBA_IMAGE_TRANSFORM_VERSION, \
                                    EXPECTED_VIMBA_IMAGE_TRANSFORM_VERSION, VmbTransformInfo, \
-                                   call_vimba_image_transform, PIXEL_FORMAT_TO_LAYOUT, \
-                                   LAYOUT_TO_PIXEL_FORMAT, PIXEL_FORMAT_CONVERTIBILITY_MAP
+                                   call_vimba_image_transform, vmb_transform, \
+                                   PIXEL_FORMAT_TO_LAYOUT, LAYOUT_TO_PIXEL_FORMAT, \
+                                   PIXEL_FORMAT_CONVERTIBILITY_MAP
 
 from ctypes import byref, sizeof, create_string_buffer
+
+from . import vimba_c, vimba_image_transform
+
+
+def __getattr__(name: str):
+    # The library versions are only known once the libraries are loaded on first use.
+    # Accessing them loads the library, so they are not in __all__: a star import must not
+    # load the libraries.
+    if name == 'VIMBA_C_VERSION':
+        return vimba_c.VIMBA_C_VERSION
+
+    if name == 'VIMBA_IMAGE_TRANSFORM_VERSION':
+        return vimba_image_transform.VIMBA_IMAGE_TRANSFORM_VERSION
+
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
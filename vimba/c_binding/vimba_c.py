@@ -27,13 +27,15 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import copy
 import ctypes
+import threading
 from typing import Callable, Any, Tuple
 from ctypes import c_void_p, c_char_p, byref, sizeof, POINTER as c_ptr, c_char_p as c_str
-from ..util import TraceEnable
+from ..util import TraceEnable, NativeCallStats
 from ..error import VimbaSystemError
 from .vimba_common import Uint32Enum, Int32Enum, VmbInt32, VmbUint32, VmbInt64, VmbUint64, \
                           VmbHandle, VmbBool, VmbDouble, VmbError, VimbaCError, VmbPixelFormat, \
-                          fmt_enum_repr, fmt_repr, fmt_flags_repr, load_vimba_lib
+                          fmt_enum_repr, fmt_repr, fmt_flags_repr, load_vimba_lib, \
+                          NativeFunctions
 
 __version__ = None
 
@@ -55,9 +57,9 @@ __all__ = [
     'VmbFrame',
     'VmbFeaturePersistSettings',
     'G_VIMBA_C_HANDLE',
-    'VIMBA_C_VERSION',
     'EXPECTED_VIMBA_C_VERSION',
     'call_vimba_c',
+    'vmb',
     'build_callback_type'
 ]
 
@@ -571,7 +573,7 @@ class VmbFeaturePersistSettings(ctypes.Structure):
 
 G_VIMBA_C_HANDLE = VmbHandle(1)
 
-VIMBA_C_VERSION = None
+# VIMBA_C_VERSION is set when VimbaC is loaded, see __getattr__
 EXPECTED_VIMBA_C_VERSION = '1.9.0'
 
 # For detailed information on the signatures see "VimbaC.h"
@@ -671,7 +673,30 @@ def _eval_vmberror(result: VmbError, func: Callable[..., Any], *args: Tuple[Any,
         raise VimbaCError(result)
 
 
-_lib_instance = _check_version(_attach_signatures(load_vimba_lib('VimbaC')))
+# VimbaC is loaded on the first call instead of at import, so that importing vimba does not
+# require the Vimba installation.
+_lib_instance = None
+_lib_lock = threading.Lock()
+_call_stats = NativeCallStats.get_instance()
+
+
+def _get_lib():
+    global _lib_instance
+
+    with _lib_lock:
+        if _lib_instance is None:
+            _lib_instance = _check_version(_attach_signatures(load_vimba_lib('VimbaC')))
+
+    return _lib_instance
+
+
+def __getattr__(name: str):
+    # VIMBA_C_VERSION is only known once the library is loaded
+    if name == 'VIMBA_C_VERSION':
+        _get_lib()
+        return globals()[name]
+
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
 
 
 @TraceEnable()
@@ -748,15 +773,25 @@ def call_vimba_c(func_name: str, *args):
         VmbRegistersWrite
         VmbCameraSettingsSave
         VmbCameraSettingsLoad
+
+    For frequently called functions, use the pre-resolved functions of the namespace vmb.
     """
-    global _lib_instance
-    getattr(_lib_instance, func_name)(*args)
+    func = getattr(_lib_instance or _get_lib(), func_name)
 
+    if _call_stats:
+        _call_stats.measure('VimbaC', func_name, func, *args)
 
-def build_callback_type(*args):
-    global _lib_instance
+    else:
+        func(*args)
 
-    lib_type = type(_lib_instance)
+
+# Functions of VimbaC without the 'Vmb' prefix, e.g. vmb.CaptureFrameQueue(*args). See
+# call_vimba_c for the available functions.
+vmb = NativeFunctions('VimbaC', _get_lib)
+
+
+def build_callback_type(*args):
+    lib_type = type(_lib_instance or _get_lib())
 
     if lib_type == ctypes.CDLL:
         return ctypes.CFUNCTYPE(*args)
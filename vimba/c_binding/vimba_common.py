@@ -31,8 +31,9 @@ import os
 import sys
 import platform
 import functools
-from typing import Tuple, List
+from typing import Callable, Tuple, List
 from ..error import VimbaSystemError
+from ..util import NativeCallStats
 
 
 __all__ = [
@@ -59,7 +60,8 @@ __all__ = [
     'fmt_repr',
     'fmt_enum_repr',
     'fmt_flags_repr',
-    'load_vimba_lib'
+    'load_vimba_lib',
+    'NativeFunctions'
 ]
 
 
@@ -459,6 +461,48 @@ def fmt_flags_repr(fmt: str, enum_type, enum_val):
     return fmt.format(_repr_flags_list(enum_type, enum_val))
 
 
+class NativeFunctions:
+    """Namespace of the functions of a native library, resolved once on first access.
+
+    'namespace.CaptureFrameQueue(*args)' calls 'VmbCaptureFrameQueue' with the same checks as
+    call_vimba_c or call_vimba_image_transform: the errcheck of the function raises VimbaCError
+    and the call is recorded by NativeCallStats if it is enabled. Unlike these functions, the
+    calls are not traced, use it in paths that are already traced by their caller.
+    """
+    def __init__(self, library: str, get_lib: Callable):
+        """Do not call directly. Use vimba_c.vmb or vimba_image_transform.vmb_transform.
+
+        Arguments:
+            library - Library name used for NativeCallStats.
+            get_lib - Callable returning the loaded library.
+        """
+        self.__library = library
+        self.__get_lib = get_lib
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError('{!r} object has no attribute {!r}'.format(
+                type(self).__name__, name))
+
+        func_name = 'Vmb' + name
+        func = getattr(self.__get_lib(), func_name)
+        library = self.__library
+        call_stats = NativeCallStats.get_instance()
+
+        def call(*args):
+            if call_stats:
+                call_stats.measure(library, func_name, func, *args)
+
+            else:
+                func(*args)
+
+        call.__name__ = call.__qualname__ = func_name
+
+        # Cache the callable, later accesses do not go through __getattr__
+        setattr(self, name, call)
+        return call
+
+
 def load_vimba_lib(vimba_project: str):
     """ Load shared library shipped with the Vimba installation
 
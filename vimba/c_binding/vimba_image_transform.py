@@ -26,14 +26,19 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
 
 import ctypes
+import json
+import os
 import sys
+import threading
+from collections.abc import Mapping
 from ctypes import byref, sizeof, c_char_p, POINTER as c_ptr
 from typing import Callable, Any, Tuple, Dict, List
 
 from ..error import VimbaSystemError
-from ..util import TraceEnable
+from ..util import TraceEnable, NativeCallStats
 from .vimba_common import Uint32Enum, VmbUint32, VmbInt32, VmbError, VmbFloat, VimbaCError, \
-                          VmbPixelFormat, load_vimba_lib, fmt_repr, fmt_enum_repr
+                          VmbPixelFormat, load_vimba_lib, fmt_repr, fmt_enum_repr, \
+                          NativeFunctions
 
 
 __all__ = [
@@ -46,9 +51,9 @@ __all__ = [
     'VmbImage',
     'VmbImageInfo',
     'VmbTransformInfo',
-    'VIMBA_IMAGE_TRANSFORM_VERSION',
     'EXPECTED_VIMBA_IMAGE_TRANSFORM_VERSION',
     'call_vimba_image_transform',
+    'vmb_transform',
     'PIXEL_FORMAT_TO_LAYOUT',
     'LAYOUT_TO_PIXEL_FORMAT',
     'PIXEL_FORMAT_CONVERTIBILITY_MAP'
@@ -311,7 +316,7 @@ class VmbTransformInfo(ctypes.Structure):
 
 
 # API
-VIMBA_IMAGE_TRANSFORM_VERSION = None
+# VIMBA_IMAGE_TRANSFORM_VERSION is set when VimbaImageTransform is loaded, see __getattr__
 if sys.platform == 'linux':
     EXPECTED_VIMBA_IMAGE_TRANSFORM_VERSION = '1.0'
 
@@ -369,7 +374,31 @@ def _eval_vmberror(result: VmbError, func: Callable[..., Any], *args: Tuple[Any,
         raise VimbaCError(result)
 
 
-_lib_instance = _check_version(_attach_signatures(load_vimba_lib('VimbaImageTransform')))
+# VimbaImageTransform is loaded on the first call instead of at import, so that importing
+# vimba does not require the Vimba installation.
+_lib_instance = None
+_lib_lock = threading.Lock()
+_call_stats = NativeCallStats.get_instance()
+
+
+def _get_lib():
+    global _lib_instance
+
+    with _lib_lock:
+        if _lib_instance is None:
+            _lib_instance = _check_version(_attach_signatures(
+                load_vimba_lib('VimbaImageTransform')))
+
+    return _lib_instance
+
+
+def __getattr__(name: str):
+    # VIMBA_IMAGE_TRANSFORM_VERSION is only known once the library is loaded
+    if name == 'VIMBA_IMAGE_TRANSFORM_VERSION':
+        _get_lib()
+        return globals()[name]
+
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
 
 
 @TraceEnable()
@@ -400,10 +429,23 @@ def call_vimba_image_transform(func_name: str, *args):
         VmbSetImageInfoFromInputParameters
         VmbSetImageInfoFromInputImage
         VmbImageTransform
+
+    For frequently called functions, use the pre-resolved functions of the namespace
+    vmb_transform.
     """
 
-    global _lib_instance
-    getattr(_lib_instance, func_name)(*args)
+    func = getattr(_lib_instance or _get_lib(), func_name)
+
+    if _call_stats:
+        _call_stats.measure('VimbaImageTransform', func_name, func, *args)
+
+    else:
+        func(*args)
+
+
+# Functions of VimbaImageTransform without the 'Vmb' prefix, e.g.
+# vmb_transform.ImageTransform(*args). See call_vimba_image_transform for the available functions.
+vmb_transform = NativeFunctions('VimbaImageTransform', _get_lib)
 
 
 PIXEL_FORMAT_TO_LAYOUT: Dict[VmbPixelFormat, Tuple[VmbPixelLayout, int]] = {
@@ -495,71 +537,162 @@ def _query_compatibility(pixel_format: VmbPixelFormat) -> Tuple[VmbPixelFormat,
     return tuple(result)
 
 
-PIXEL_FORMAT_CONVERTIBILITY_MAP: Dict[VmbPixelFormat, Tuple[VmbPixelFormat, ...]] = {
-    VmbPixelFormat.Mono8: _query_compatibility(VmbPixelFormat.Mono8),
-    VmbPixelFormat.Mono10: _query_compatibility(VmbPixelFormat.Mono10),
-    VmbPixelFormat.Mono10p: _query_compatibility(VmbPixelFormat.Mono10p),
-    VmbPixelFormat.Mono12: _query_compatibility(VmbPixelFormat.Mono12),
-    VmbPixelFormat.Mono12Packed: _query_compatibility(VmbPixelFormat.Mono12Packed),
-    VmbPixelFormat.Mono12p: _query_compatibility(VmbPixelFormat.Mono12p),
-    VmbPixelFormat.Mono14: _query_compatibility(VmbPixelFormat.Mono14),
-    VmbPixelFormat.Mono16: _query_compatibility(VmbPixelFormat.Mono16),
-
-    VmbPixelFormat.BayerGR8: _query_compatibility(VmbPixelFormat.BayerGR8),
-    VmbPixelFormat.BayerRG8: _query_compatibility(VmbPixelFormat.BayerRG8),
-    VmbPixelFormat.BayerGB8: _query_compatibility(VmbPixelFormat.BayerGB8),
-    VmbPixelFormat.BayerBG8: _query_compatibility(VmbPixelFormat.BayerBG8),
-    VmbPixelFormat.BayerGR10: _query_compatibility(VmbPixelFormat.BayerGR10),
-    VmbPixelFormat.BayerRG10: _query_compatibility(VmbPixelFormat.BayerRG10),
-    VmbPixelFormat.BayerGB10: _query_compatibility(VmbPixelFormat.BayerGB10),
-    VmbPixelFormat.BayerBG10: _query_compatibility(VmbPixelFormat.BayerBG10),
-    VmbPixelFormat.BayerGR12: _query_compatibility(VmbPixelFormat.BayerGR12),
-    VmbPixelFormat.BayerRG12: _query_compatibility(VmbPixelFormat.BayerRG12),
-    VmbPixelFormat.BayerGB12: _query_compatibility(VmbPixelFormat.BayerGB12),
-    VmbPixelFormat.BayerBG12: _query_compatibility(VmbPixelFormat.BayerBG12),
-    VmbPixelFormat.BayerGR12Packed: _query_compatibility(VmbPixelFormat.BayerGR12Packed),
-    VmbPixelFormat.BayerRG12Packed: _query_compatibility(VmbPixelFormat.BayerRG12Packed),
-    VmbPixelFormat.BayerGB12Packed: _query_compatibility(VmbPixelFormat.BayerGB12Packed),
-    VmbPixelFormat.BayerBG12Packed: _query_compatibility(VmbPixelFormat.BayerBG12Packed),
-    VmbPixelFormat.BayerGR10p: _query_compatibility(VmbPixelFormat.BayerGR10p),
-    VmbPixelFormat.BayerRG10p: _query_compatibility(VmbPixelFormat.BayerRG10p),
-    VmbPixelFormat.BayerGB10p: _query_compatibility(VmbPixelFormat.BayerGB10p),
-    VmbPixelFormat.BayerBG10p: _query_compatibility(VmbPixelFormat.BayerBG10p),
-    VmbPixelFormat.BayerGR12p: _query_compatibility(VmbPixelFormat.BayerGR12p),
-    VmbPixelFormat.BayerRG12p: _query_compatibility(VmbPixelFormat.BayerRG12p),
-    VmbPixelFormat.BayerGB12p: _query_compatibility(VmbPixelFormat.BayerGB12p),
-    VmbPixelFormat.BayerBG12p: _query_compatibility(VmbPixelFormat.BayerBG12p),
-    VmbPixelFormat.BayerGR16: _query_compatibility(VmbPixelFormat.BayerGR16),
-    VmbPixelFormat.BayerRG16: _query_compatibility(VmbPixelFormat.BayerRG16),
-    VmbPixelFormat.BayerGB16: _query_compatibility(VmbPixelFormat.BayerGB16),
-    VmbPixelFormat.BayerBG16: _query_compatibility(VmbPixelFormat.BayerBG16),
-
-    VmbPixelFormat.Rgb8: _query_compatibility(VmbPixelFormat.Rgb8),
-    VmbPixelFormat.Bgr8: _query_compatibility(VmbPixelFormat.Bgr8),
-    VmbPixelFormat.Rgb10: _query_compatibility(VmbPixelFormat.Rgb10),
-    VmbPixelFormat.Bgr10: _query_compatibility(VmbPixelFormat.Bgr10),
-    VmbPixelFormat.Rgb12: _query_compatibility(VmbPixelFormat.Rgb12),
-    VmbPixelFormat.Bgr12: _query_compatibility(VmbPixelFormat.Bgr12),
-    VmbPixelFormat.Rgb14: _query_compatibility(VmbPixelFormat.Rgb14),
-    VmbPixelFormat.Bgr14: _query_compatibility(VmbPixelFormat.Bgr14),
-    VmbPixelFormat.Rgb16: _query_compatibility(VmbPixelFormat.Rgb16),
-    VmbPixelFormat.Bgr16: _query_compatibility(VmbPixelFormat.Bgr16),
-    VmbPixelFormat.Argb8: _query_compatibility(VmbPixelFormat.Argb8),
-    VmbPixelFormat.Rgba8: _query_compatibility(VmbPixelFormat.Rgba8),
-    VmbPixelFormat.Bgra8: _query_compatibility(VmbPixelFormat.Bgra8),
-    VmbPixelFormat.Rgba10: _query_compatibility(VmbPixelFormat.Rgba10),
-    VmbPixelFormat.Bgra10: _query_compatibility(VmbPixelFormat.Bgra10),
-    VmbPixelFormat.Rgba12: _query_compatibility(VmbPixelFormat.Rgba12),
-    VmbPixelFormat.Bgra12: _query_compatibility(VmbPixelFormat.Bgra12),
-    VmbPixelFormat.Rgba14: _query_compatibility(VmbPixelFormat.Rgba14),
-    VmbPixelFormat.Bgra14: _query_compatibility(VmbPixelFormat.Bgra14),
-    VmbPixelFormat.Rgba16: _query_compatibility(VmbPixelFormat.Rgba16),
-    VmbPixelFormat.Bgra16: _query_compatibility(VmbPixelFormat.Bgra16),
-
-    VmbPixelFormat.Yuv411: _query_compatibility(VmbPixelFormat.Yuv411),
-    VmbPixelFormat.Yuv422: _query_compatibility(VmbPixelFormat.Yuv422),
-    VmbPixelFormat.Yuv444: _query_compatibility(VmbPixelFormat.Yuv444),
-    VmbPixelFormat.YCbCr411_8_CbYYCrYY: _query_compatibility(VmbPixelFormat.YCbCr411_8_CbYYCrYY),
-    VmbPixelFormat.YCbCr422_8_CbYCrY: _query_compatibility(VmbPixelFormat.YCbCr422_8_CbYCrY),
-    VmbPixelFormat.YCbCr8_CbYCr: _query_compatibility(VmbPixelFormat.YCbCr8_CbYCr)
-}
+# Pixel formats whose conversions are queried from VimbaImageTransform
+_CONVERTIBLE_PIXEL_FORMATS: Tuple[VmbPixelFormat, ...] = (
+    VmbPixelFormat.Mono8,
+    VmbPixelFormat.Mono10,
+    VmbPixelFormat.Mono10p,
+    VmbPixelFormat.Mono12,
+    VmbPixelFormat.Mono12Packed,
+    VmbPixelFormat.Mono12p,
+    VmbPixelFormat.Mono14,
+    VmbPixelFormat.Mono16,
+
+    VmbPixelFormat.BayerGR8,
+    VmbPixelFormat.BayerRG8,
+    VmbPixelFormat.BayerGB8,
+    VmbPixelFormat.BayerBG8,
+    VmbPixelFormat.BayerGR10,
+    VmbPixelFormat.BayerRG10,
+    VmbPixelFormat.BayerGB10,
+    VmbPixelFormat.BayerBG10,
+    VmbPixelFormat.BayerGR12,
+    VmbPixelFormat.BayerRG12,
+    VmbPixelFormat.BayerGB12,
+    VmbPixelFormat.BayerBG12,
+    VmbPixelFormat.BayerGR12Packed,
+    VmbPixelFormat.BayerRG12Packed,
+    VmbPixelFormat.BayerGB12Packed,
+    VmbPixelFormat.BayerBG12Packed,
+    VmbPixelFormat.BayerGR10p,
+    VmbPixelFormat.BayerRG10p,
+    VmbPixelFormat.BayerGB10p,
+    VmbPixelFormat.BayerBG10p,
+    VmbPixelFormat.BayerGR12p,
+    VmbPixelFormat.BayerRG12p,
+    VmbPixelFormat.BayerGB12p,
+    VmbPixelFormat.BayerBG12p,
+    VmbPixelFormat.BayerGR16,
+    VmbPixelFormat.BayerRG16,
+    VmbPixelFormat.BayerGB16,
+    VmbPixelFormat.BayerBG16,
+
+    VmbPixelFormat.Rgb8,
+    VmbPixelFormat.Bgr8,
+    VmbPixelFormat.Rgb10,
+    VmbPixelFormat.Bgr10,
+    VmbPixelFormat.Rgb12,
+    VmbPixelFormat.Bgr12,
+    VmbPixelFormat.Rgb14,
+    VmbPixelFormat.Bgr14,
+    VmbPixelFormat.Rgb16,
+    VmbPixelFormat.Bgr16,
+    VmbPixelFormat.Argb8,
+    VmbPixelFormat.Rgba8,
+    VmbPixelFormat.Bgra8,
+    VmbPixelFormat.Rgba10,
+    VmbPixelFormat.Bgra10,
+    VmbPixelFormat.Rgba12,
+    VmbPixelFormat.Bgra12,
+    VmbPixelFormat.Rgba14,
+    VmbPixelFormat.Bgra14,
+    VmbPixelFormat.Rgba16,
+    VmbPixelFormat.Bgra16,
+
+    VmbPixelFormat.Yuv411,
+    VmbPixelFormat.Yuv422,
+    VmbPixelFormat.Yuv444,
+    VmbPixelFormat.YCbCr411_8_CbYYCrYY,
+    VmbPixelFormat.YCbCr422_8_CbYCrY,
+    VmbPixelFormat.YCbCr8_CbYCr
+)
+
+
+def _cache_file() -> str:
+    # The conversions depend only on the VimbaImageTransform version. The cache directory
+    # can be set by VIMBA_PYTHON_CACHE_DIR, an empty value disables the cache.
+    cache_dir = os.environ.get('VIMBA_PYTHON_CACHE_DIR',
+                               os.path.join(os.path.expanduser('~'), '.cache', 'vimbapython'))
+    if not cache_dir:
+        return ''
+
+    _get_lib()
+    name = 'pixel_format_convertibility_{}.json'.format(VIMBA_IMAGE_TRANSFORM_VERSION)
+    return os.path.join(cache_dir, name)
+
+
+class _ConvertibilityMap(Mapping):
+    """Read-only mapping of a pixel format to the formats it can be converted to.
+
+    The formats are queried from VimbaImageTransform on first access of each pixel format
+    instead of at import. Queried results are stored in a small json file, so later
+    processes read them without querying.
+    """
+    def __init__(self, formats: Tuple[VmbPixelFormat, ...]):
+        self.__formats = formats
+        self.__map: Dict[VmbPixelFormat, Tuple[VmbPixelFormat, ...]] = {}
+        self.__cache_loaded = False
+        self.__lock = threading.Lock()
+
+    def __getitem__(self, fmt: VmbPixelFormat) -> Tuple[VmbPixelFormat, ...]:
+        try:
+            return self.__map[fmt]
+
+        except KeyError:
+            pass
+
+        if fmt not in self.__formats:
+            raise KeyError(fmt)
+
+        with self.__lock:
+            if not self.__cache_loaded:
+                self.__load_cache()
+
+            if fmt not in self.__map:
+                self.__map[VmbPixelFormat(fmt)] = _query_compatibility(fmt)
+                self.__save_cache()
+
+            return self.__map[fmt]
+
+    def __iter__(self):
+        return iter(self.__formats)
+
+    def __len__(self):
+        return len(self.__formats)
+
+    def __load_cache(self):
+        self.__cache_loaded = True
+        file = _cache_file()
+
+        try:
+            with open(file) as f:
+                cached = json.load(f)
+
+            for fmt, formats in cached.items():
+                self.__map[VmbPixelFormat(int(fmt))] = tuple([VmbPixelFormat(f) for f in formats])
+
+        except (OSError, ValueError, TypeError, AttributeError):
+            # No (valid) cache, formats are queried when needed
+            pass
+
+    def __save_cache(self):
+        file = _cache_file()
+        if not file:
+            return
+
+        tmp_file = '{}.{}.tmp'.format(file, os.getpid())
+        try:
+            os.makedirs(os.path.dirname(file), exist_ok=True)
+
+            with open(tmp_file, 'w') as f:
+                json.dump({str(int(k)): [int(fmt) for fmt in v] for k, v in self.__map.items()}, f)
+
+            os.replace(tmp_file, file)
+
+        except OSError:
+            # The cache is an optimization only, ignore read-only or missing directories
+            pass
+
+
+PIXEL_FORMAT_CONVERTIBILITY_MAP: Mapping[VmbPixelFormat, Tuple[VmbPixelFormat, ...]] = \
+    _ConvertibilityMap(_CONVERTIBLE_PIXEL_FORMATS)
@@ -25,6 +25,7 @@ OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
 
+import collections
 import enum
 import os
 import copy
@@ -32,7 +33,8 @@ import threading
 
 from ctypes import POINTER
 from typing import Tuple, List, Callable, cast, Optional, Union, Dict
-from .c_binding import call_vimba_c, build_callback_type, byref, sizeof, decode_cstr, decode_flags
+from .c_binding import call_vimba_c, vmb, build_callback_type, byref, sizeof, decode_cstr, \
+                       decode_flags
 from .c_binding import VmbCameraInfo, VmbHandle, VmbUint32, G_VIMBA_C_HANDLE, VmbAccessMode, \
                        VimbaCError, VmbError, VmbFrame, VmbFeaturePersist, VmbFeaturePersistSettings
 from .feature import discover_features, discover_feature, FeatureTypes, FeaturesTuple, \
@@ -41,7 +43,7 @@ from .shared import filter_features_by_name, filter_features_by_type, filter_aff
                     filter_selected_features, filter_features_by_category, \
                     attach_feature_accessors, remove_feature_accessors, read_memory, \
                     write_memory, read_registers, write_registers
-from .frame import Frame, FormatTuple, PixelFormat, AllocationMode
+from .frame import Frame, FramePool, FormatTuple, PixelFormat, AllocationMode
 from .util import Log, TraceEnable, RuntimeTypeCheckEnable, EnterContextOnCall, \
                   LeaveContextOnCall, RaiseIfInsideContext, RaiseIfOutsideContext
 from .error import VimbaSystemError, VimbaCameraError, VimbaTimeout, VimbaFeatureError
@@ -50,6 +52,7 @@ from .error import VimbaSystemError, VimbaCameraError, VimbaTimeout, VimbaFeatur
 __all__ = [
     'AccessMode',
     'PersistType',
+    'OverflowPolicy',
     'FrameHandler',
     'Camera',
     'CameraEvent',
@@ -111,14 +114,31 @@ class PersistType(enum.IntEnum):
     NoLUT = VmbFeaturePersist.NoLUT
 
 
+class OverflowPolicy(enum.IntEnum):
+    """Enum specifying what happens to a frame delivered in streaming mode with dispatch
+    workers if the dispatch queue is full.
+
+    Enum values:
+        Block      - Wait until a worker takes a frame from the queue.
+        DropOldest - Requeue the oldest queued frame into the camera and enqueue the new frame.
+        DropNewest - Requeue the new frame into the camera.
+    """
+    Block = 0
+    DropOldest = 1
+    DropNewest = 2
+
+
 class _Context:
     def __init__(self, cam, frames, handler, callback):
         self.cam = cam
         self.cam_handle = _cam_handle_accessor(cam)
         self.frames = frames
+        # Buffer address to Frame, filled once the frames are announced and their buffers known
+        self.frames_by_buffer: Dict[int, Frame] = {}
         self.frames_lock = threading.Lock()
         self.frames_handler = handler
         self.frames_callback = callback
+        self.frames_dispatcher: Optional[_FrameDispatcher] = None
 
 
 class _State:
@@ -142,6 +162,9 @@ class _StateInit(_State):
             except VimbaCError as e:
                 return _build_camera_error(self.context.cam, e)
 
+        self.context.frames_by_buffer = {_frame_handle_accessor(frame).buffer: frame
+                                         for frame in self.context.frames}
+
         return _StateAnnounced(self.context)
 
 
@@ -226,22 +249,25 @@ class _StateAcquiring(_State):
             self.queue_frame(frame)
 
         for frame in self.context.frames:
-            frame_handle = _frame_handle_accessor(frame)
+            self.wait_for_frame(frame, timeout_ms)
 
-            try:
-                call_vimba_c('VmbCaptureFrameWait', self.context.cam_handle, byref(frame_handle),
-                             timeout_ms)
+    @TraceEnable()
+    def wait_for_frame(self, frame, timeout_ms: int):
+        frame_handle = _frame_handle_accessor(frame)
 
-            except VimbaCError as e:
-                raise _build_camera_error(self.context.cam, e) from e
+        try:
+            vmb.CaptureFrameWait(self.context.cam_handle, byref(frame_handle), timeout_ms)
+
+        except VimbaCError as e:
+            raise _build_camera_error(self.context.cam, e) from e
 
     @TraceEnable()
     def queue_frame(self, frame):
         frame_handle = _frame_handle_accessor(frame)
 
         try:
-            call_vimba_c('VmbCaptureFrameQueue', self.context.cam_handle, byref(frame_handle),
-                         self.context.frames_callback)
+            vmb.CaptureFrameQueue(self.context.cam_handle, byref(frame_handle),
+                                  self.context.frames_callback)
 
         except VimbaCError as e:
             raise _build_camera_error(self.context.cam, e) from e
@@ -298,14 +324,123 @@ class _CaptureFsm:
         if isinstance(self.__state, _StateAcquiring):
             self.__state.wait_for_frames(timeout_ms)
 
+    def wait_for_frame(self, frame, timeout_ms: int):
+        # Wait for a single queued Frame only in AcquiringMode
+        if isinstance(self.__state, _StateAcquiring):
+            self.__state.wait_for_frame(frame, timeout_ms)
+
     def queue_frame(self, frame):
         # Queue Frame only in AcquiringMode
         if isinstance(self.__state, _StateAcquiring):
             self.__state.queue_frame(frame)
 
 
+class _FrameDispatcher:
+    # Runs the frame handler of streaming mode on worker threads. The frame callback only
+    # enqueues the frame into a bounded queue and returns.
+    def __init__(self, fsm: _CaptureFsm, workers: int, queue_size: int,
+                 overflow: OverflowPolicy):
+        self.__fsm = fsm
+        self.__queue_size = queue_size
+        self.__overflow = overflow
+        self.__queue: collections.deque = collections.deque()
+        self.__cond = threading.Condition()
+        self.__running = True
+        self.__queued = 0
+        self.__dropped = 0
+        self.__processed = 0
+        self.__threads = [threading.Thread(target=self.__run, daemon=True,
+                                           name='VimbaFrameDispatch-{}'.format(i))
+                          for i in range(workers)]
+
+    def start(self):
+        for thread in self.__threads:
+            thread.start()
+
+    def stop(self):
+        # Discard the queued frames and wait for the frames being handled. A handler stopping
+        # the streaming does not wait for itself.
+        with self.__cond:
+            self.__running = False
+            self.__dropped += len(self.__queue)
+            self.__queue.clear()
+            self.__cond.notify_all()
+
+        for thread in self.__threads:
+            if thread is not threading.current_thread():
+                thread.join()
+
+    def get_counters(self) -> Dict[str, int]:
+        with self.__cond:
+            return {'queued': self.__queued, 'dropped': self.__dropped,
+                    'processed': self.__processed}
+
+    def put(self, frame: Frame):
+        dropped = None
+
+        with self.__cond:
+            if self.__overflow == OverflowPolicy.Block:
+                while self.__running and len(self.__queue) >= self.__queue_size:
+                    self.__cond.wait()
+
+            if not self.__running:
+                return
+
+            if len(self.__queue) >= self.__queue_size:
+                if self.__overflow == OverflowPolicy.DropNewest:
+                    dropped = frame
+
+                else:
+                    dropped = self.__queue.popleft()
+
+                self.__dropped += 1
+
+            if dropped is not frame:
+                self.__queue.append(frame)
+                self.__queued += 1
+                self.__cond.notify_all()
+
+            # A dropped frame is given back to the camera, without it the frame would be lost
+            # for the rest of the streaming. This is done under the lock: once stop() cleared
+            # the running flag, the frames are about to be revoked and must not be requeued.
+            if dropped is not None:
+                try:
+                    self.__fsm.queue_frame(dropped)
+
+                except VimbaCameraError as e:
+                    Log.get_instance().error('Failed to requeue dropped frame: {}'.format(e))
+
+    def __run(self):
+        context = self.__fsm.get_context()
+
+        while True:
+            with self.__cond:
+                while self.__running and not self.__queue:
+                    self.__cond.wait()
+
+                if not self.__running:
+                    return
+
+                frame = self.__queue.popleft()
+                self.__cond.notify_all()
+
+            try:
+                context.frames_handler(context.cam, frame)
+
+            except Exception as e:
+                msg = 'Caught Exception in handler: '
+                msg += 'Type: {}, '.format(type(e))
+                msg += 'Value: {}, '.format(e)
+                msg += 'raised by: {}'.format(context.frames_handler)
+                Log.get_instance().error(msg)
+
+            with self.__cond:
+                self.__processed += 1
+
+
 @TraceEnable()
-def _frame_generator(cam, limit: Optional[int], timeout_ms: int, allocation_mode: AllocationMode):
+def _frame_generator(cam, limit: Optional[int], timeout_ms: int, allocation_mode: AllocationMode,
+                     pool: Optional[FramePool] = None):
     if cam.is_streaming():
         raise VimbaCameraError('Operation not supported while streaming.')
 
@@ -324,7 +459,7 @@ def _frame_generator(cam, limit: Optional[int], timeout_ms: int, allocation_mode
             fsm.wait_for_frames(timeout_ms)
 
             # Return copy of internally used frame to keep them independent.
-            frame_copy = copy.deepcopy(frames[0])
+            frame_copy = pool.copy(frames[0]) if pool else copy.deepcopy(frames[0])
             fsm.leave_capturing_mode()
             frame_copy._frame.frameID = cnt
             cnt += 1
@@ -338,6 +473,73 @@ def _frame_generator(cam, limit: Optional[int], timeout_ms: int, allocation_mode
             raise exc
 
 
+@TraceEnable()
+def _persistent_frame_generator(cam, limit: Optional[int], timeout_ms: int,
+                                allocation_mode: AllocationMode, buffer_count: int,
+                                pool: Optional[FramePool] = None):
+    if cam.is_streaming():
+        raise VimbaCameraError('Operation not supported while streaming.')
+
+    frame_data_size = cam.get_feature_by_name('PayloadSize').get()
+    frames = tuple([Frame(frame_data_size, allocation_mode) for _ in range(buffer_count)])
+    fsm = _CaptureFsm(_Context(cam, frames, None, None))
+    cnt = 0
+
+    # The buffers stay queued across frames, this needs continuous acquisition. In SingleFrame
+    # or MultiFrame mode the camera would stop after the first frames. The mode is restored
+    # when the generator is closed.
+    acquisition_mode = _set_acquisition_mode(cam, 'Continuous')
+
+    try:
+        # Enter Capturing mode once. The frames are queued as a ring: each frame is queued
+        # again as soon as it is copied, so they are filled in the order they are waited for.
+        exc = fsm.enter_capturing_mode()
+        if exc:
+            raise exc
+
+        for frame in frames:
+            fsm.queue_frame(frame)
+
+        while True if limit is None else cnt < limit:
+            frame = frames[cnt % buffer_count]
+            fsm.wait_for_frame(frame, timeout_ms)
+
+            # Return copy of internally used frame to keep them independent.
+            frame_copy = pool.copy(frame) if pool else copy.deepcopy(frame)
+            fsm.queue_frame(frame)
+            frame_copy._frame.frameID = cnt
+            cnt += 1
+
+            yield frame_copy
+
+    finally:
+        # Leave Capturing mode
+        exc = fsm.leave_capturing_mode()
+
+        if acquisition_mode is not None:
+            _set_acquisition_mode(cam, acquisition_mode)
+
+        if exc:
+            raise exc
+
+
+def _set_acquisition_mode(cam, mode: str) -> Optional[str]:
+    # Set AcquisitionMode to mode if it differs. Returns the previous mode if it was changed,
+    # None if it was already set or the camera has no AcquisitionMode.
+    try:
+        feat = cam.get_feature_by_name('AcquisitionMode')
+
+    except VimbaFeatureError:
+        return None
+
+    previous = str(feat.get())
+    if previous == mode:
+        return None
+
+    feat.set(mode)
+    return previous
+
+
 class Camera:
     """This class allows access to a Camera detected by Vimba.
     Camera is meant be used in conjunction with the "with" - statement.
@@ -354,6 +556,7 @@ class Camera:
         self.__feats: FeaturesTuple = ()
         self.__context_cnt: int = 0
         self.__capture_fsm: Optional[_CaptureFsm] = None
+        self.__dispatcher: Optional[_FrameDispatcher] = None
         self._disconnected = False
 
     @TraceEnable()
@@ -619,7 +822,10 @@ class Camera:
     def get_frame_generator(self,
                             limit: Optional[int] = None,
                             timeout_ms: int = 2000,
-                            allocation_mode: AllocationMode = AllocationMode.AnnounceFrame):
+                            allocation_mode: AllocationMode = AllocationMode.AnnounceFrame,
+                            persistent: bool = False,
+                            buffer_count: int = 3,
+                            pool: Optional[FramePool] = None):
         """Construct frame generator, providing synchronous image acquisition.
 
         The Frame generator acquires a new frame with each execution.
@@ -631,6 +837,15 @@ class Camera:
             timeout_ms - Timeout in milliseconds of frame acquisition.
             allocation_mode - Allocation mode deciding if buffer allocation should be done by
                               VimbaPython or the Transport Layer
+            persistent - If False, capture is set up and torn down for each frame. If True,
+                         the camera stays acquiring into a ring of buffer_count frames until
+                         the generator is closed, saving the capture setup per frame. Frames
+                         are then buffered: a frame may have been acquired before it is
+                         requested. This needs AcquisitionMode Continuous: the mode is set to
+                         Continuous while the generator runs and restored when it is closed.
+            buffer_count - Number of frames of the ring used if persistent is True.
+            pool - If given, each frame is copied into a Frame leased from the pool instead
+                   of a new Frame. The caller returns it with Frame.release() when done.
 
         Returns:
             Frame generator expression
@@ -639,6 +854,7 @@ class Camera:
             RuntimeError if called outside "with" - statement scope.
             ValueError if a limit is supplied and negative.
             ValueError if a timeout_ms is negative.
+            ValueError if a buffer_count is not positive.
             VimbaTimeout if Frame acquisition timed out.
             VimbaCameraError if Camera is streaming while executing the generator.
         """
@@ -648,20 +864,29 @@ class Camera:
         if timeout_ms <= 0:
             raise ValueError('Given Timeout {} is not > 0'.format(timeout_ms))
 
-        return _frame_generator(self, limit, timeout_ms, allocation_mode)
+        if persistent:
+            if buffer_count <= 0:
+                raise ValueError('Given buffer_count {} must be positive'.format(buffer_count))
+
+            return _persistent_frame_generator(self, limit, timeout_ms, allocation_mode,
+                                               buffer_count, pool)
+
+        return _frame_generator(self, limit, timeout_ms, allocation_mode, pool)
 
     @TraceEnable()
     @RaiseIfOutsideContext()
     @RuntimeTypeCheckEnable()
     def get_frame(self,
                   timeout_ms: int = 2000,
-                  allocation_mode: AllocationMode = AllocationMode.AnnounceFrame) -> Frame:
+                  allocation_mode: AllocationMode = AllocationMode.AnnounceFrame,
+                  pool: Optional[FramePool] = None) -> Frame:
         """Get single frame from camera. Synchronous frame acquisition.
 
         Arguments:
             timeout_ms - Timeout in milliseconds of frame acquisition.
             allocation_mode - Allocation mode deciding if buffer allocation should be done by
                               VimbaPython or the Transport Layer
+            pool - If given, the frame is leased from the pool, see get_frame_generator.
 
         Returns:
             Frame from camera
@@ -672,7 +897,7 @@ class Camera:
             ValueError if a timeout_ms is negative.
             VimbaTimeout if Frame acquisition timed out.
         """
-        return next(self.get_frame_generator(1, timeout_ms, allocation_mode))
+        return next(self.get_frame_generator(1, timeout_ms, allocation_mode, pool=pool))
 
     @TraceEnable()
     @RaiseIfOutsideContext()
@@ -680,29 +905,49 @@ class Camera:
     def start_streaming(self,
                         handler: FrameHandler,
                         buffer_count: int = 5,
-                        allocation_mode: AllocationMode = AllocationMode.AnnounceFrame):
+                        allocation_mode: AllocationMode = AllocationMode.AnnounceFrame,
+                        workers: int = 0,
+                        queue_size: Optional[int] = None,
+                        overflow: OverflowPolicy = OverflowPolicy.Block):
         """Enter streaming mode
 
         Enter streaming mode is also known as asynchronous frame acquisition.
         While active, the camera acquires and buffers frames continuously.
         With each acquired frame, a given FrameHandler is called with a new Frame.
 
+        By default the handler is called on the thread delivering the frames, a slow handler
+        delays the delivery of the next frames. With workers, the frames are put into a
+        bounded queue and the handler is called on the worker threads. With more than one
+        worker, the handler is called concurrently and must be thread-safe. See
+        get_dispatch_counters for the number of queued, dropped and processed frames.
+
         Arguments:
             handler - Callable that is executed on each acquired frame.
             buffer_count - Number of frames supplied as internal buffer.
             allocation_mode - Allocation mode deciding if buffer allocation should be done by
                               VimbaPython or the Transport Layer
+            workers - Number of threads calling the handler. If 0, the handler is called on
+                      the thread delivering the frames.
+            queue_size - Maximum number of frames waiting for a worker. If None, buffer_count.
+            overflow - What happens to a frame delivered while the queue is full.
 
         Raises:
             TypeError if parameters do not match their type hint.
             RuntimeError if called outside "with" - statement scope.
             ValueError if buffer is less or equal to zero.
+            ValueError if workers is negative or queue_size is less or equal to zero.
             VimbaCameraError if the camera is already streaming.
             VimbaCameraError if anything went wrong on entering streaming mode.
         """
         if buffer_count <= 0:
             raise ValueError('Given buffer_count {} must be positive'.format(buffer_count))
 
+        if workers < 0:
+            raise ValueError('Given workers {} must not be negative'.format(workers))
+
+        if queue_size is not None and queue_size <= 0:
+            raise ValueError('Given queue_size {} must be positive'.format(queue_size))
+
         if self.is_streaming():
             raise VimbaCameraError('Camera \'{}\' already streaming.'.format(self.get_id()))
 
@@ -711,7 +956,16 @@ class Camera:
         frames = tuple([Frame(payload_size, allocation_mode) for _ in range(buffer_count)])
         callback = build_callback_type(None, VmbHandle, POINTER(VmbFrame))(self.__frame_cb_wrapper)
 
-        self.__capture_fsm = _CaptureFsm(_Context(self, frames, handler, callback))
+        context = _Context(self, frames, handler, callback)
+        self.__capture_fsm = _CaptureFsm(context)
+
+        # Counters of a previous streaming mode are not reported for this one
+        self.__dispatcher = None
+
+        if workers:
+            self.__dispatcher = _FrameDispatcher(self.__capture_fsm, workers,
+                                                 queue_size or buffer_count, overflow)
+            context.frames_dispatcher = self.__dispatcher
 
         # Try to enter streaming mode. If this fails perform cleanup and raise error
         exc = self.__capture_fsm.enter_capturing_mode()
@@ -721,6 +975,9 @@ class Camera:
             raise exc
 
         else:
+            if workers:
+                self.__dispatcher.start()
+
             for frame in frames:
                 self.__capture_fsm.queue_frame(frame)
 
@@ -736,6 +993,10 @@ class Camera:
             RuntimeError if called outside "with" - statement scope.
             VimbaCameraError if anything went wrong on leaving streaming mode.
         """
+        # Stop dispatching before the frames are revoked, also if the camera was disconnected
+        if self.__capture_fsm is not None and self.__capture_fsm.get_context().frames_dispatcher:
+            self.__capture_fsm.get_context().frames_dispatcher.stop()
+
         if not self.is_streaming():
             return
 
@@ -748,6 +1009,20 @@ class Camera:
         finally:
             self.__capture_fsm = None
 
+    @TraceEnable()
+    def get_dispatch_counters(self) -> Dict[str, int]:
+        """Get the frame counters of the current or last streaming mode.
+
+        Returns:
+            Dictionary with the number of frames 'queued' for the workers, 'dropped' on
+            overflow or on leaving streaming mode, and 'processed' by the handler. All zero if
+            the current or last streaming mode ran without workers.
+        """
+        if self.__dispatcher is None:
+            return {'queued': 0, 'dropped': 0, 'processed': 0}
+
+        return self.__dispatcher.get_counters()
+
     @TraceEnable()
     def is_streaming(self) -> bool:
         """Returns True if the camera is currently in streaming mode. If not, returns False."""
@@ -775,7 +1050,9 @@ class Camera:
         if self.__capture_fsm is None:
             return
 
-        if frame not in self.__capture_fsm.get_context().frames:
+        frames_by_buffer = self.__capture_fsm.get_context().frames_by_buffer
+
+        if frames_by_buffer.get(_frame_handle_accessor(frame).buffer) is not frame:
             raise ValueError('Given Frame is not from Queue')
 
         self.__capture_fsm.queue_frame(frame)
@@ -966,19 +1243,17 @@ class Camera:
 
         context = self.__capture_fsm.get_context()
 
-        with context.frames_lock:
-            raw_frame = raw_frame_ptr.contents
-            frame = None
+        # Find the Frame pointing to the same buffer
+        frame = context.frames_by_buffer.get(raw_frame_ptr.contents.buffer)
+        assert frame is not None
 
-            for f in context.frames:
-                # Access Frame internals to compare if both point to the same buffer
-                if raw_frame.buffer == _frame_handle_accessor(f).buffer:
-                    frame = f
-                    break
+        # Hand the frame over to the workers
+        if context.frames_dispatcher:
+            context.frames_dispatcher.put(frame)
+            return
 
+        with context.frames_lock:
             # Execute registered handler
-            assert frame is not None
-
             try:
                 context.frames_handler(self, frame)
 
@@ -31,7 +31,7 @@ import ctypes
 import threading
 
 from typing import Tuple, Union, List, Callable, Optional, cast, Type
-from .c_binding import call_vimba_c, byref, sizeof, create_string_buffer, decode_cstr, \
+from .c_binding import call_vimba_c, vmb, byref, sizeof, create_string_buffer, decode_cstr, \
                        decode_flags, build_callback_type
 from .c_binding import VmbFeatureInfo, VmbFeatureFlags, VmbUint32, VmbInt64, VmbHandle, \
                        VmbFeatureVisibility, VmbBool, VmbFeatureEnumEntry, VmbFeatureData, \
@@ -358,7 +358,7 @@ class BoolFeature(_BaseFeature):
         c_val = VmbBool(False)
 
         try:
-            call_vimba_c('VmbFeatureBoolGet', self._handle, self._info.name, byref(c_val))
+            vmb.FeatureBoolGet(self._handle, self._info.name, byref(c_val))
 
         except VimbaCError as e:
             err = e.get_error_code()
@@ -387,7 +387,7 @@ class BoolFeature(_BaseFeature):
         as_bool = bool(val)
 
         try:
-            call_vimba_c('VmbFeatureBoolSet', self._handle, self._info.name, as_bool)
+            vmb.FeatureBoolSet(self._handle, self._info.name, as_bool)
 
         except VimbaCError as e:
             err = e.get_error_code()
@@ -434,7 +434,7 @@ class CommandFeature(_BaseFeature):
             VimbaFeatureError if access rights are not sufficient.
         """
         try:
-            call_vimba_c('VmbFeatureCommandRun', self._handle, self._info.name)
+            vmb.FeatureCommandRun(self._handle, self._info.name)
 
         except VimbaCError as e:
             exc = cast(VimbaFeatureError, e)
@@ -460,7 +460,7 @@ class CommandFeature(_BaseFeature):
         c_val = VmbBool(False)
 
         try:
-            call_vimba_c('VmbFeatureCommandIsDone', self._handle, self._info.name, byref(c_val))
+            vmb.FeatureCommandIsDone(self._handle, self._info.name, byref(c_val))
 
         except VimbaCError as e:
             if e.get_error_code() == VmbError.InvalidAccess:
@@ -581,7 +581,7 @@ class EnumFeature(_BaseFeature):
         c_val = ctypes.c_char_p(None)
 
         try:
-            call_vimba_c('VmbFeatureEnumGet', self._handle, self._info.name, byref(c_val))
+            vmb.FeatureEnumGet(self._handle, self._info.name, byref(c_val))
 
         except VimbaCError as e:
             if e.get_error_code() == VmbError.InvalidAccess:
@@ -613,7 +613,7 @@ class EnumFeature(_BaseFeature):
             as_entry = self.get_entry(int(val))
 
         try:
-            call_vimba_c('VmbFeatureEnumSet', self._handle, self._info.name, bytes(as_entry))
+            vmb.FeatureEnumSet(self._handle, self._info.name, bytes(as_entry))
 
         except VimbaCError as e:
             err = e.get_error_code()
@@ -684,7 +684,7 @@ class FloatFeature(_BaseFeature):
         c_val = VmbDouble(0.0)
 
         try:
-            call_vimba_c('VmbFeatureFloatGet', self._handle, self._info.name, byref(c_val))
+            vmb.FeatureFloatGet(self._handle, self._info.name, byref(c_val))
 
         except VimbaCError as e:
             if e.get_error_code() == VmbError.InvalidAccess:
@@ -768,7 +768,7 @@ class FloatFeature(_BaseFeature):
         as_float = float(val)
 
         try:
-            call_vimba_c('VmbFeatureFloatSet', self._handle, self._info.name, as_float)
+            vmb.FeatureFloatSet(self._handle, self._info.name, as_float)
 
         except VimbaCError as e:
             err = e.get_error_code()
@@ -827,7 +827,7 @@ class IntFeature(_BaseFeature):
         c_val = VmbInt64()
 
         try:
-            call_vimba_c('VmbFeatureIntGet', self._handle, self._info.name, byref(c_val))
+            vmb.FeatureIntGet(self._handle, self._info.name, byref(c_val))
 
         except VimbaCError as e:
             if e.get_error_code() == VmbError.InvalidAccess:
@@ -909,7 +909,7 @@ class IntFeature(_BaseFeature):
         as_int = int(val)
 
         try:
-            call_vimba_c('VmbFeatureIntSet', self._handle, self._info.name, as_int)
+            vmb.FeatureIntSet(self._handle, self._info.name, as_int)
 
         except VimbaCError as e:
             err = e.get_error_code()
@@ -1082,8 +1082,7 @@ class StringFeature(_BaseFeature):
 
         # Query buffer length
         try:
-            call_vimba_c('VmbFeatureStringGet', self._handle, self._info.name, None, 0,
-                         byref(c_buf_len))
+            vmb.FeatureStringGet(self._handle, self._info.name, None, 0, byref(c_buf_len))
 
         except VimbaCError as e:
             if e.get_error_code() == VmbError.InvalidAccess:
@@ -1098,8 +1097,7 @@ class StringFeature(_BaseFeature):
 
         # Copy string from C-Layer
         try:
-            call_vimba_c('VmbFeatureStringGet', self._handle, self._info.name, c_buf, c_buf_len,
-                         None)
+            vmb.FeatureStringGet(self._handle, self._info.name, c_buf, c_buf_len, None)
 
         except VimbaCError as e:
             if e.get_error_code() == VmbError.InvalidAccess:
@@ -1127,8 +1125,7 @@ class StringFeature(_BaseFeature):
         as_str = str(val)
 
         try:
-            call_vimba_c('VmbFeatureStringSet', self._handle, self._info.name,
-                         as_str.encode('utf8'))
+            vmb.FeatureStringSet(self._handle, self._info.name, as_str.encode('utf8'))
 
         except VimbaCError as e:
             err = e.get_error_code()
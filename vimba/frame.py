@@ -27,12 +27,12 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import enum
 import ctypes
-import copy
 import functools
+import threading
 
-from typing import Optional, Tuple
+from typing import Optional, Tuple, List, Union
 from .c_binding import byref, sizeof, decode_flags
-from .c_binding import call_vimba_c, call_vimba_image_transform, VmbFrameStatus, VmbFrameFlags, \
+from .c_binding import call_vimba_c, vmb_transform, VmbFrameStatus, VmbFrameFlags, \
                        VmbFrame, VmbHandle, VmbPixelFormat, VmbImage, VmbDebayerMode, \
                        VmbTransformInfo, PIXEL_FORMAT_CONVERTIBILITY_MAP, PIXEL_FORMAT_TO_LAYOUT
 from .feature import FeaturesTuple, FeatureTypes, FeatureTypeTypes, discover_features
@@ -49,6 +49,11 @@ except ModuleNotFoundError:
     numpy = None  # type: ignore
 
 
+# Arrays accepted by RuntimeTypeCheckEnable for numpy.ndarray arguments. The hint must resolve
+# without numpy, the functions using it raise ImportError then.
+_NdArray = Union[numpy.ndarray, numpy.memmap] if numpy else object
+
+
 __all__ = [
     'PixelFormat',
     'MONO_PIXEL_FORMATS',
@@ -64,6 +69,7 @@ __all__ = [
     'FrameStatus',
     'Debayer',
     'Frame',
+    'FramePool',
     'FrameTuple',
     'FormatTuple',
     'intersect_pixel_formats'
@@ -584,6 +590,75 @@ def _replace_invalid_feature_calls(feats: FeaturesTuple) -> FeaturesTuple:
     return feats
 
 
+@functools.lru_cache(maxsize=None)
+def _numpy_layout(fmt: int, width: int, height: int):
+    # Shape and dtype of the numpy.ndarray view of an image. They depend only on the arguments,
+    # so VmbSetImageInfoFromPixelFormat is called once per (pixel format, width, height).
+    # None if the pixel format has no numpy layout.
+    layout = PIXEL_FORMAT_TO_LAYOUT.get(fmt)
+
+    if not layout:
+        return None
+
+    c_image = VmbImage()
+    c_image.Size = sizeof(c_image)
+
+    vmb_transform.SetImageInfoFromPixelFormat(fmt, width, height, byref(c_image))
+
+    bits_per_channel = layout[1]
+    channels_per_pixel = c_image.ImageInfo.PixelInfo.BitsPerPixel // bits_per_channel
+
+    return ((height, width, channels_per_pixel),
+            numpy.uint8 if bits_per_channel == 8 else numpy.uint16)
+
+
+# Transform setup of convert_pixel_format_into per thread, the image data pointers are set
+# before each transformation.
+_transforms = threading.local()
+
+
+def _get_transform(fmt: int, target_fmt: int, width: int, height: int,
+                   debayer_mode: Optional[Debayer]):
+    key = (fmt, target_fmt, width, height, debayer_mode)
+
+    try:
+        cache = _transforms.cache
+
+    except AttributeError:
+        cache = _transforms.cache = {}
+
+    transform = cache.get(key)
+    if transform:
+        return transform
+
+    if PixelFormat(target_fmt) not in PixelFormat(fmt).get_convertible_formats():
+        raise ValueError('Current PixelFormat can\'t be converted into given format.')
+
+    c_src_image = VmbImage()
+    c_src_image.Size = sizeof(c_src_image)
+
+    vmb_transform.SetImageInfoFromPixelFormat(fmt, width, height, byref(c_src_image))
+
+    c_dst_image = VmbImage()
+    c_dst_image.Size = sizeof(c_dst_image)
+
+    layout, bits = PIXEL_FORMAT_TO_LAYOUT[VmbPixelFormat(target_fmt)]
+
+    vmb_transform.SetImageInfoFromInputImage(byref(c_src_image), layout, bits, byref(c_dst_image))
+
+    transform_info = VmbTransformInfo()
+    if debayer_mode and (fmt in BAYER_PIXEL_FORMATS):
+        vmb_transform.SetDebayerMode(VmbDebayerMode(debayer_mode), byref(transform_info))
+
+    transform = cache[key] = (c_src_image, c_dst_image, transform_info)
+    return transform
+
+
+# VmbFrame fields copied along with the image data. Pointers are set by the copy target.
+_FRAME_INFO_FIELDS = ('receiveStatus', 'receiveFlags', 'imageSize', 'ancillarySize', 'pixelFormat',
+                      'width', 'height', 'offsetX', 'offsetY', 'frameID', 'timestamp')
+
+
 class Frame:
     """This class allows access to Frames acquired by a camera. The Frame is basically
     a buffer that wraps image data and some metadata.
@@ -591,6 +666,7 @@ class Frame:
     def __init__(self, buffer_size: int, allocation_mode: AllocationMode):
         """Do not call directly. Create Frames via Camera methods instead."""
         self._allocation_mode = allocation_mode
+        self._pool: Optional['FramePool'] = None
 
         # Allocation is not necessary for the AllocAndAnnounce case. In that case the Transport
         # Layer will take care of buffer allocation. The self._buffer variable will be updated after
@@ -613,22 +689,61 @@ class Frame:
         return msg.format(self._frame.frameID, str(FrameStatus(self._frame.receiveStatus)),
                           hex(self._frame.buffer))
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.release()
+
     def __deepcopy__(self, memo):
         cls = self.__class__
         result = cls.__new__(cls)
         memo[id(self)] = result
 
+        # Copy the buffer with a single memmove. The generic copy of a ctypes array is
+        # a lot slower and makes an intermediate copy of the data.
+        buffer_size = sizeof(self._buffer)
+        buffer = (ctypes.c_ubyte * buffer_size)()
+        ctypes.memmove(buffer, self._buffer, buffer_size)
+
         # VmbFrame contains Pointers and ctypes.Structure with Pointers can't be copied.
         # As a workaround VmbFrame contains a deepcopy-like Method performing deep copy of all
         # Attributes except PointerTypes. Those must be set manually after the copy operation.
-        setattr(result, '_buffer', copy.deepcopy(self._buffer, memo))
+        setattr(result, '_buffer', buffer)
         setattr(result, '_frame', self._frame.deepcopy_skip_ptr(memo))
+        setattr(result, '_pool', None)
 
         result._frame.buffer = ctypes.cast(result._buffer, ctypes.c_void_p)
         result._frame.bufferSize = sizeof(result._buffer)
 
         return result
 
+    def _copy_to(self, frame: 'Frame'):
+        """Copy image data and metadata into an existing Frame, reusing its buffer if it has
+        the same size.
+        """
+        buffer_size = sizeof(self._buffer)
+        if sizeof(frame._buffer) != buffer_size:
+            frame._buffer = (ctypes.c_ubyte * buffer_size)()
+
+        ctypes.memmove(frame._buffer, self._buffer, buffer_size)
+
+        for name in _FRAME_INFO_FIELDS:
+            setattr(frame._frame, name, getattr(self._frame, name))
+
+        frame._frame.buffer = ctypes.cast(frame._buffer, ctypes.c_void_p)
+        frame._frame.bufferSize = buffer_size
+
+    def release(self):
+        """Return a Frame leased from a FramePool to its pool.
+
+        The Frame and all data obtained from it (e.g. by as_numpy_ndarray) must not be used
+        afterwards, the buffer is reused for another Frame. Leaving a "with" - statement on
+        the Frame releases it as well. Does nothing for Frames not taken from a FramePool.
+        """
+        if self._pool is not None:
+            self._pool._release(self)
+
     def _set_buffer(self, buffer: ctypes.c_void_p):
         """Set self._buffer to memory pointed to by passed buffer pointer
 
@@ -799,8 +914,7 @@ class Frame:
         c_src_image.Size = sizeof(c_src_image)
         c_src_image.Data = ctypes.cast(self._buffer, ctypes.c_void_p)
 
-        call_vimba_image_transform('VmbSetImageInfoFromPixelFormat', fmt, width, height,
-                                   byref(c_src_image))
+        vmb_transform.SetImageInfoFromPixelFormat(fmt, width, height, byref(c_src_image))
 
         # 3) Specify Transformation Output Image
         c_dst_image = VmbImage()
@@ -808,8 +922,8 @@ class Frame:
 
         layout, bits = PIXEL_FORMAT_TO_LAYOUT[VmbPixelFormat(target_fmt)]
 
-        call_vimba_image_transform('VmbSetImageInfoFromInputImage', byref(c_src_image), layout,
-                                   bits, byref(c_dst_image))
+        vmb_transform.SetImageInfoFromInputImage(byref(c_src_image), layout,
+                                                 bits, byref(c_dst_image))
 
         # 4) Allocate Buffer and perform transformation
         img_size = int(height * width * c_dst_image.ImageInfo.PixelInfo.BitsPerPixel / 8)
@@ -821,12 +935,11 @@ class Frame:
         # 5) Setup Debayering mode if given.
         transform_info = VmbTransformInfo()
         if debayer_mode and (fmt in BAYER_PIXEL_FORMATS):
-            call_vimba_image_transform('VmbSetDebayerMode', VmbDebayerMode(debayer_mode),
-                                       byref(transform_info))
+            vmb_transform.SetDebayerMode(VmbDebayerMode(debayer_mode), byref(transform_info))
 
         # 6) Perform Transformation
-        call_vimba_image_transform('VmbImageTransform', byref(c_src_image), byref(c_dst_image),
-                                   byref(transform_info), 1)
+        vmb_transform.ImageTransform(byref(c_src_image), byref(c_dst_image),
+                                     byref(transform_info), 1)
 
         # 7) Copy ancillary data if existing
         if anc_size:
@@ -842,6 +955,72 @@ class Frame:
         self._frame.imageSize = img_size
         self._frame.pixelFormat = target_fmt
 
+    @RuntimeTypeCheckEnable()
+    def convert_pixel_format_into(self, target_fmt: PixelFormat,
+                                  out: Optional[_NdArray] = None,
+                                  debayer_mode: Optional[Debayer] = None) -> _NdArray:
+        """Convert the image to given format into a numpy.ndarray, the Frame is not modified.
+
+        Unlike convert_pixel_format, no buffer is allocated if 'out' is given: in a pipeline
+        converting each frame, 'out' (or a set of arrays used in turn) can be reused for every
+        frame of the same size. The transform setup is cached per thread for each
+        (format, target format, width, height, debayer mode).
+
+        Arguments:
+            target_fmt - PixelFormat to convert to, it must have a numpy layout.
+            out - Optional C-contiguous numpy.ndarray or numpy.memmap receiving the converted
+                  image, with the shape and dtype of the result. A new array is allocated if
+                  None.
+            debayer_mode - Non-default algorithm used to debayer images in Bayer Formats, see
+                           convert_pixel_format.
+
+        Returns:
+            'out' or the new numpy.ndarray containing the converted image.
+
+        Raises:
+            TypeError if parameters do not match their type hint.
+            ImportError if numpy is not installed.
+            ValueError if the current format can't be converted into 'target_fmt'.
+            VimbaFrameError if 'target_fmt' can't be represented as numpy.ndarray.
+            ValueError if 'out' has not the required shape, dtype or is not C-contiguous.
+        """
+        if numpy is None:
+            raise ImportError('\'Frame.convert_pixel_format_into()\' requires module \'numpy\'.')
+
+        fmt = self._frame.pixelFormat
+        width = self._frame.width
+        height = self._frame.height
+
+        layout = _numpy_layout(target_fmt, width, height)
+
+        if not layout:
+            msg = 'Can\'t construct numpy.ndarray for Pixelformat {}.'
+            raise VimbaFrameError(msg.format(str(target_fmt)))
+
+        shape, dtype = layout
+
+        if out is None:
+            out = numpy.empty(shape, dtype=dtype)
+
+        elif out.shape != shape or out.dtype != dtype or not out.flags.c_contiguous:
+            msg = 'Given out must be a C-contiguous array of shape {} and dtype {}.'
+            raise ValueError(msg.format(shape, numpy.dtype(dtype).name))
+
+        if fmt == target_fmt:
+            ctypes.memmove(out.ctypes.data, self._buffer, out.nbytes)
+            return out
+
+        transform = _get_transform(fmt, target_fmt, width, height, debayer_mode)
+        c_src_image, c_dst_image, transform_info = transform
+
+        c_src_image.Data = ctypes.addressof(self._buffer)
+        c_dst_image.Data = out.ctypes.data
+
+        vmb_transform.ImageTransform(byref(c_src_image), byref(c_dst_image),
+                                     byref(transform_info), 1)
+
+        return out
+
     def as_numpy_ndarray(self) -> 'numpy.ndarray':
         """Construct numpy.ndarray view on VimbaFrame.
 
@@ -856,29 +1035,16 @@ class Frame:
             raise ImportError('\'Frame.as_opencv_image()\' requires module \'numpy\'.')
 
         # Construct numpy overlay on underlaying image buffer
-        height = self._frame.height
-        width = self._frame.width
-        fmt = self._frame.pixelFormat
-
-        c_image = VmbImage()
-        c_image.Size = sizeof(c_image)
-
-        call_vimba_image_transform('VmbSetImageInfoFromPixelFormat', fmt, width, height,
-                                   byref(c_image))
-
-        layout = PIXEL_FORMAT_TO_LAYOUT.get(fmt)
+        frame = self._frame
+        layout = _numpy_layout(frame.pixelFormat, frame.width, frame.height)
 
         if not layout:
             msg = 'Can\'t construct numpy.ndarray for Pixelformat {}. ' \
                   'Use \'frame.convert_pixel_format()\' to convert to a different Pixelformat.'
             raise VimbaFrameError(msg.format(str(self.get_pixel_format())))
 
-        bits_per_channel = layout[1]
-        channels_per_pixel = c_image.ImageInfo.PixelInfo.BitsPerPixel // bits_per_channel
-
-        return numpy.ndarray(shape=(height, width, channels_per_pixel),
-                             buffer=self._buffer,  # type: ignore
-                             dtype=numpy.uint8 if bits_per_channel == 8 else numpy.uint16)
+        shape, dtype = layout
+        return numpy.ndarray(shape=shape, buffer=self._buffer, dtype=dtype)  # type: ignore
 
     def as_opencv_image(self) -> 'numpy.ndarray':
         """Construct OpenCV compatible view on VimbaFrame.
@@ -905,6 +1071,51 @@ class Frame:
         return self.as_numpy_ndarray()
 
 
+class FramePool:
+    """Pool of reusable Frames, used by the synchronous frame acquisition instead of a new
+    copy of each acquired Frame (see Camera.get_frame_generator).
+
+    A Frame taken from the pool is a lease: its buffer is reused once it is returned with
+    Frame.release() or at the end of a "with" - statement on the Frame. Frames not returned
+    are garbage collected as usual. At most 'size' returned Frames are kept for reuse.
+    """
+    @RuntimeTypeCheckEnable()
+    def __init__(self, size: int = 4):
+        """Create an empty pool, Frames are allocated on first use.
+
+        Raises:
+            TypeError if parameters do not match their type hint.
+            ValueError if size is not positive.
+        """
+        if size <= 0:
+            raise ValueError('Given size {} must be positive'.format(size))
+
+        self.__size = size
+        self.__free: List[Frame] = []
+        self.__lock = threading.Lock()
+
+    def copy(self, frame: Frame) -> Frame:
+        """Copy a Frame into a Frame of the pool and lease it."""
+        with self.__lock:
+            result = self.__free.pop() if self.__free else None
+
+        if result is None:
+            result = Frame(sizeof(frame._buffer), AllocationMode.AnnounceFrame)
+
+        frame._copy_to(result)
+        result._pool = self
+        return result
+
+    def _release(self, frame: Frame):
+        with self.__lock:
+            if frame._pool is not self:
+                return
+
+            frame._pool = None
+            if len(self.__free) < self.__size:
+                self.__free.append(frame)
+
+
 @TraceEnable()
 @RuntimeTypeCheckEnable()
 def intersect_pixel_formats(fmts1: FormatTuple, fmts2: FormatTuple) -> FormatTuple:
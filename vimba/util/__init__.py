@@ -47,9 +47,11 @@ __all__ = [
     'LOG_CONFIG_CRITICAL_CONSOLE_ONLY',
     'LOG_CONFIG_CRITICAL_FILE_ONLY',
     'LOG_CONFIG_CRITICAL',
+    'NativeCallStats',
 
     # Decorators
     'TraceEnable',
+    'TraceSpans',
     'ScopedLogEnable',
     'RuntimeTypeCheckEnable',
     'EnterContextOnCall',
@@ -65,7 +67,8 @@ from .log import Log, LogLevel, LogConfig, LOG_CONFIG_TRACE_CONSOLE_ONLY, \
                  LOG_CONFIG_ERROR_FILE_ONLY, LOG_CONFIG_ERROR, LOG_CONFIG_CRITICAL_CONSOLE_ONLY, \
                  LOG_CONFIG_CRITICAL_FILE_ONLY, LOG_CONFIG_CRITICAL
 
-from .tracer import TraceEnable
+from .tracer import TraceEnable, TraceSpans
+from .call_stats import NativeCallStats
 from .scoped_log import ScopedLogEnable
 from .runtime_type_check import RuntimeTypeCheckEnable
 from .context_decorator import EnterContextOnCall, LeaveContextOnCall, RaiseIfInsideContext, \
@@ -0,0 +1,185 @@
+"""BSD 2-Clause License
+
+Copyright (c) 2019, Allied Vision Technologies GmbH
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+import json
+import os
+import threading
+import time
+
+from typing import Any, Callable, Dict, List
+
+
+__all__ = [
+    'NativeCallStats'
+]
+
+
+# Upper bounds of the latency histogram buckets in ns: 1 us, 2 us, 4 us, ... 2**26 us (~67 s).
+# The last bucket counts all longer calls.
+_BUCKET_COUNT = 27
+_BUCKET_BOUNDS_NS = [1000 * 2**i for i in range(_BUCKET_COUNT)]
+
+
+def _bucket_index(duration_ns: int) -> int:
+    # Index of the smallest bound >= duration_ns, without searching the bounds
+    us = (duration_ns + 999) // 1000
+    return min(max(us - 1, 0).bit_length(), _BUCKET_COUNT)
+
+
+def _format_bound(bound_ns: int) -> str:
+    return repr(bound_ns / 1e9)
+
+
+class NativeCallStats:
+    """Call counts, cumulative time and latency histograms of each native function called via
+    call_vimba_c and call_vimba_image_transform. Since this is a Singleton use
+    NativeCallStats.get_instance() to access it.
+
+    Recording is disabled by default, the cost of a native call is then a single check. It can
+    be enabled with enable() or by setting VIMBA_PYTHON_CALL_STATS=1 in the environment.
+    """
+    __instance = None
+
+    @staticmethod
+    def get_instance() -> 'NativeCallStats':
+        """Get NativeCallStats instance."""
+        if NativeCallStats.__instance is None:
+            NativeCallStats.__instance = NativeCallStats()
+
+        return NativeCallStats.__instance
+
+    def __init__(self):
+        """Do not call directly. Use NativeCallStats.get_instance() instead."""
+        self.__enabled = os.environ.get('VIMBA_PYTHON_CALL_STATS', '0') == '1'
+        self.__lock = threading.Lock()
+        self.__stats: Dict[str, List[Any]] = {}
+
+    def __bool__(self):
+        return self.__enabled
+
+    def enable(self):
+        """Start recording native calls."""
+        self.__enabled = True
+
+    def disable(self):
+        """Stop recording native calls. Recorded statistics are kept until reset()."""
+        self.__enabled = False
+
+    def reset(self):
+        """Remove all recorded statistics."""
+        with self.__lock:
+            self.__stats = {}
+
+    def measure(self, library: str, func_name: str, func: Callable, *args):
+        """Call func with args and record its duration under library and func_name.
+
+        Returns:
+            The return value of func.
+        """
+        start = time.perf_counter_ns()
+
+        try:
+            result = func(*args)
+
+        except BaseException:
+            self.record(library, func_name, time.perf_counter_ns() - start, failed=True)
+            raise
+
+        self.record(library, func_name, time.perf_counter_ns() - start)
+        return result
+
+    def record(self, library: str, func_name: str, duration_ns: int, failed: bool = False):
+        """Add a call of func_name lasting duration_ns to the statistics."""
+        index = _bucket_index(duration_ns)
+
+        with self.__lock:
+            stats = self.__stats.get(func_name)
+
+            if stats is None:
+                # library, count, errors, total ns, max ns, bucket counts
+                stats = [library, 0, 0, 0, 0, [0] * (_BUCKET_COUNT + 1)]
+                self.__stats[func_name] = stats
+
+            stats[1] += 1
+            stats[2] += failed
+            stats[3] += duration_ns
+            stats[4] = max(stats[4], duration_ns)
+            stats[5][index] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Get a copy of the recorded statistics.
+
+        Returns:
+            Dictionary from native function name to a dictionary with keys 'library', 'count',
+            'errors', 'total_s', 'max_s' and 'buckets'. 'buckets' holds the number of calls per
+            histogram bucket, the bucket upper bounds are get_bucket_bounds() followed by
+            infinity.
+        """
+        with self.__lock:
+            items = [(name, list(stats), list(stats[5])) for name, stats in self.__stats.items()]
+
+        return {name: {'library': stats[0], 'count': stats[1], 'errors': stats[2],
+                       'total_s': stats[3] / 1e9, 'max_s': stats[4] / 1e9, 'buckets': buckets}
+                for name, stats, buckets in sorted(items)}
+
+    @staticmethod
+    def get_bucket_bounds() -> List[float]:
+        """Get the upper bounds in seconds of the histogram buckets, without infinity."""
+        return [bound / 1e9 for bound in _BUCKET_BOUNDS_NS]
+
+    def to_json(self, indent: int = None) -> str:
+        """Export the recorded statistics as JSON (see snapshot) with the bucket bounds."""
+        return json.dumps({'bucket_bounds_s': self.get_bucket_bounds(),
+                           'functions': self.snapshot()}, indent=indent)
+
+    def to_prometheus(self) -> str:
+        """Export the recorded statistics in the Prometheus text exposition format."""
+        name = 'vimba_native_call_duration_seconds'
+        lines = ['# HELP {} Duration of native Vimba function calls.'.format(name),
+                 '# TYPE {} histogram'.format(name)]
+        errors = []
+
+        for func_name, stats in self.snapshot().items():
+            labels = 'library="{}",function="{}"'.format(stats['library'], func_name)
+            bounds = [_format_bound(bound) for bound in _BUCKET_BOUNDS_NS] + ['+Inf']
+            cumulated = 0
+
+            for bound, count in zip(bounds, stats['buckets']):
+                cumulated += count
+                lines.append('{}_bucket{{{},le="{}"}} {}'.format(name, labels, bound, cumulated))
+
+            lines.append('{}_sum{{{}}} {!r}'.format(name, labels, stats['total_s']))
+            lines.append('{}_count{{{}}} {}'.format(name, labels, stats['count']))
+            errors.append('vimba_native_call_errors_total{{{}}} {}'.format(labels,
+                                                                          stats['errors']))
+
+        lines.append('# HELP vimba_native_call_errors_total Native Vimba function calls that '
+                     'raised an exception.')
+        lines.append('# TYPE vimba_native_call_errors_total counter')
+        lines.extend(errors)
+
+        return '\n'.join(lines) + '\n'
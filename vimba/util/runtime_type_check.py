@@ -26,8 +26,9 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
 
 import collections.abc
+import os
 
-from inspect import isfunction, ismethod, signature
+from inspect import isfunction, ismethod, signature, Parameter
 from functools import wraps
 from typing import get_type_hints, Union
 from .log import Log
@@ -38,6 +39,13 @@ __all__ = [
 ]
 
 
+# Setting VIMBA_PYTHON_RUNTIME_TYPE_CHECK=0 in the environment disables the checks before import:
+# the decorator returns the callable unchanged, without any overhead.
+_TYPE_CHECK_AT_IMPORT = os.environ.get('VIMBA_PYTHON_RUNTIME_TYPE_CHECK', '1') != '0'
+
+_POSITIONAL_KINDS = (Parameter.POSITIONAL_ONLY, Parameter.POSITIONAL_OR_KEYWORD)
+
+
 class RuntimeTypeCheckEnable:
     """Decorator adding runtime type checking to the wrapped callable.
 
@@ -46,30 +54,91 @@ class RuntimeTypeCheckEnable:
     arguments to not match a TypeError is raised.
     Note: This decorator is no replacement for a feature complete TypeChecker. It supports only
     a subset of all types expressible by type hints.
+
+    The signature is inspected once per callable and the type hints are resolved on its first
+    call. The checks can be switched off process-wide with RuntimeTypeCheckEnable.set_enabled()
+    or, without any remaining overhead, with VIMBA_PYTHON_RUNTIME_TYPE_CHECK=0 in the
+    environment.
     """
     _log = Log.get_instance()
+    _enabled = _TYPE_CHECK_AT_IMPORT
+
+    @staticmethod
+    def set_enabled(enabled: bool):
+        """Enable or disable the runtime type checks of all decorated callables."""
+        RuntimeTypeCheckEnable._enabled = enabled
+
+    @staticmethod
+    def is_enabled() -> bool:
+        """Returns True if the runtime type checks are enabled."""
+        return RuntimeTypeCheckEnable._enabled
 
     def __call__(self, func):
+        if not _TYPE_CHECK_AT_IMPORT:
+            return func
+
+        sig = signature(func)
+        validator = None
+
         @wraps(func)
         def wrapper(*args, **kwargs):
-            full_args, hints = self.__dismantle_sig(func, *args, **kwargs)
+            nonlocal validator
+
+            if RuntimeTypeCheckEnable._enabled:
+                # Type hints may contain forward references, resolve them on first call.
+                if validator is None:
+                    validator = self.__build_validator(func, sig)
 
-            for arg_name in hints:
-                self.__verify_arg(func, hints[arg_name], (arg_name, full_args[arg_name]))
+                validator(args, kwargs)
 
             return func(*args, **kwargs)
 
         return wrapper
 
-    def __dismantle_sig(self, func, *args, **kwargs):
-        # Get merge args, kwargs and defaults to complete argument list.
-        full_args = signature(func).bind(*args, **kwargs)
-        full_args.apply_defaults()
-
+    def __build_validator(self, func, sig):
         # Get available type hints, remove return value.
         hints = get_type_hints(func)
         hints.pop('return', None)
 
+        params = list(sig.parameters.values())
+        defaults_match = all(self.__matches(hints[p.name], p.default) for p in params
+                             if p.name in hints and p.default is not Parameter.empty)
+
+        if not (defaults_match and all(p.kind in _POSITIONAL_KINDS for p in params)):
+            def validate(args, kwargs):
+                full_args, _ = self.__dismantle_sig(sig, hints, *args, **kwargs)
+
+                for arg_name in hints:
+                    self.__verify_arg(func, hints[arg_name], (arg_name, full_args[arg_name]))
+
+            return validate
+
+        # Fast path: arguments are looked up by position or keyword without binding the
+        # signature. Omitted arguments take their default, which is known to match.
+        checks = tuple([(i, p.name, hints[p.name]) for i, p in enumerate(params)
+                        if p.name in hints])
+
+        def validate_fast(args, kwargs):
+            for i, arg_name, type_hint in checks:
+                if i < len(args):
+                    arg = args[i]
+
+                elif arg_name in kwargs:
+                    arg = kwargs[arg_name]
+
+                else:
+                    continue
+
+                if type(arg) is not type_hint:
+                    self.__verify_arg(func, type_hint, (arg_name, arg))
+
+        return validate_fast
+
+    def __dismantle_sig(self, sig, hints, *args, **kwargs):
+        # Get merge args, kwargs and defaults to complete argument list.
+        full_args = sig.bind(*args, **kwargs)
+        full_args.apply_defaults()
+
         return (full_args.arguments, hints)
 
     def __verify_arg(self, func, type_hint, arg_spec):
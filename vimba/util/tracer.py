@@ -25,16 +25,29 @@ OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
 
+import array
+import itertools
+import os
+import threading
+import time
+
 from functools import reduce, wraps
 from inspect import signature
+from typing import List, Optional, Tuple
 from .log import Log
 
 
 __all__ = [
-    'TraceEnable'
+    'TraceEnable',
+    'TraceSpans'
 ]
 
 
+# Setting VIMBA_PYTHON_TRACE=0 in the environment disables tracing before import: the decorator
+# returns the callable unchanged, log entries and spans are not recorded for it.
+_TRACE_AT_IMPORT = os.environ.get('VIMBA_PYTHON_TRACE', '1') != '0'
+
+
 _FMT_MSG_ENTRY: str = 'Enter | {}'
 _FMT_MSG_LEAVE: str = 'Leave | {}'
 _FMT_MSG_RAISE: str = 'Raise | {}, {}'
@@ -86,9 +99,65 @@ def _create_raise_msg(name: str, level: int,  exc_type: Exception, exc_value: st
     return _FMT_MSG_RAISE.format(msg, exc)
 
 
+class TraceSpans:
+    """Ring buffer of the latest timing spans of calls to TraceEnable decorated callables.
+
+    A span is (name, thread id, start, stop), with start and stop from time.perf_counter_ns().
+    Recording a span stores these values in preallocated arrays without formatting anything,
+    so spans can be recorded in production to find latency spikes. Use
+    TraceEnable.enable_spans() to start recording.
+    """
+    def __init__(self, size: int = 65536):
+        if size <= 0:
+            raise ValueError('Given size {} must be positive'.format(size))
+
+        self.__size = size
+        self.__names: List[Optional[str]] = [None] * size
+        self.__threads = array.array('Q', bytes(8 * size))
+        self.__starts = array.array('q', bytes(8 * size))
+        self.__stops = array.array('q', bytes(8 * size))
+        self.__counter = itertools.count()
+        self.__count = 0
+
+    def __len__(self):
+        return min(self.__count, self.__size)
+
+    def record(self, name: str, start: int, stop: int):
+        """Record a span of the current thread."""
+        # next() on itertools.count is atomic, each call gets its own slot
+        n = next(self.__counter)
+        i = n % self.__size
+
+        self.__names[i] = name
+        self.__threads[i] = threading.get_ident()
+        self.__starts[i] = start
+        self.__stops[i] = stop
+        self.__count = n + 1
+
+    def get_spans(self) -> List[Tuple[str, int, int, int]]:
+        """Get the recorded spans (name, thread id, start ns, stop ns), oldest first."""
+        count = self.__count
+        first = max(count - self.__size, 0)
+        indexes = [n % self.__size for n in range(first, count)]
+
+        return [(self.__names[i], self.__threads[i], self.__starts[i], self.__stops[i])
+                for i in indexes if self.__names[i] is not None]
+
+    def get_slowest(self, n: int = 10) -> List[Tuple[str, int, int, int]]:
+        """Get the n recorded spans of longest duration, slowest first."""
+        return sorted(self.get_spans(), key=lambda span: span[3] - span[2], reverse=True)[:n]
+
+    def clear(self):
+        """Remove all recorded spans."""
+        self.__names[:] = [None] * self.__size
+        self.__counter = itertools.count()
+        self.__count = 0
+
+
 class _Tracer:
     __log = Log.get_instance()
     __level: int = 0
+    spans: Optional[TraceSpans] = None
 
     @staticmethod
     def is_log_enabled() -> bool:
@@ -120,11 +189,48 @@ class TraceEnable:
     """Decorator: Adds an entry of LogLevel. Trace on entry and exit of the wrapped function.
     On exit, the log entry contains information if the function was left normally or with an
     exception.
+
+    If spans are enabled (see enable_spans), the timing span of each call is recorded instead
+    of the log entries. With VIMBA_PYTHON_TRACE=0 in the environment, the decorator returns the
+    callable unchanged.
     """
+    @staticmethod
+    def enable_spans(size: int = 65536) -> TraceSpans:
+        """Record the timing spans of all decorated callables into a new ring buffer of the
+        given size, which is returned.
+        """
+        spans = TraceSpans(size)
+        _Tracer.spans = spans
+        return spans
+
+    @staticmethod
+    def disable_spans():
+        """Stop recording timing spans."""
+        _Tracer.spans = None
+
+    @staticmethod
+    def get_spans() -> Optional[TraceSpans]:
+        """Get the ring buffer spans are recorded into, None if spans are disabled."""
+        return _Tracer.spans
+
     def __call__(self, func):
+        if not _TRACE_AT_IMPORT:
+            return func
+
+        name = '{}.{}'.format(func.__module__, func.__qualname__)
+
         @wraps(func)
         def wrapper(*args, **kwargs):
-            if _Tracer.is_log_enabled():
+            spans = _Tracer.spans
+            if spans is not None:
+                start = time.perf_counter_ns()
+                try:
+                    return func(*args, **kwargs)
+
+                finally:
+                    spans.record(name, start, time.perf_counter_ns())
+
+            elif _Tracer.is_log_enabled():
                 with _Tracer(func, *args, **kwargs):
                     result = func(*args, **kwargs)
 
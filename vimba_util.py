@@ -17,6 +17,12 @@ Module name:
 """
 
 import os
+import copy
+import time
+import functools
+import queue
+import threading
+from contextlib import nullcontext, closing
 import numpy as np
 from PIL import Image
 from PIL import ExifTags
@@ -25,12 +31,129 @@ from vimba import *
 from util import create_exif_tag
 
 _timeout_s_offset = 0.5
+#exposure time limits in us and max number of retries to set it
+_exposure_min = 77
+_exposure_max = 67108901
+# _exposure_max = 1900000
+_nmax = 200
+#index of the pixel format names in cam.get_pixel_formats()
+_pixel_format_index = {'mono8':0,'rgb8':1,'rgb16':3}
+#standard configurations, see cam_apply_config
+profiles = {
+    'rgb16_1920x1080':{'pixel_format':'rgb16','roi':(1920,1080,0,0)},
+    'mono8_640x480c':{'pixel_format':'mono8','roi':(640,480,640,300)},
+}
+
+class ImageWriter():
+    '''
+    background writer of acquisition images.
+    the images are saved as tif by a pool of threads, so the acquisition
+    continues while the previous frames are written.
+    save() blocks when queue_size images are waiting (back-pressure), the
+    memory used by the pending images is bounded.
+    close() (or the end of a "with" statement, even on exception) waits
+    until all the images are written and reports the write errors and the
+    throughput.
+    workers: number of writer threads
+    queue_size: max number of images waiting to be written
+    catalog: optional catalog.Catalog, the written files are added to it
+    '''
+    def __init__(self,workers=2,queue_size=8,catalog=None):
+        self.catalog = catalog
+        self.written = 0
+        self.nbytes = 0
+        self.errors = []
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._threads = [threading.Thread(target=self._run,daemon=True)
+                         for _ in range(workers)]
+        for thread in self._threads:
+            thread.start()
+        
+    def __enter__(self):
+        return self
+    
+    def __exit__(self,exc_type,exc_value,exc_traceback):
+        self.close()
+        
+    def save(self,data,tags,file,release=None):
+        '''
+        queue the image data (2d array) with its exif tags (create_exif_tag)
+        to be saved in file, wait if the queue is full.
+        data must not be modified until it is written.
+        release: optional callable called once data is written or the write
+        failed, e.g. Frame.release of a frame leased from a FramePool
+        '''
+        if not self._threads:
+            raise RuntimeError('ImageWriter is closed')
+        self._queue.put((data,tags,file,release))
+        
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            data,tags,file,release = job
+            try:
+                Image.fromarray(data).save(file,tiffinfo=tags)
+                if self.catalog is not None:
+                    self.catalog.add(file)
+                with self._lock:
+                    self.written += 1
+                    self.nbytes += data.nbytes
+            except Exception as e:
+                with self._lock:
+                    self.errors.append((file,e))
+            finally:
+                if release is not None:
+                    release()
+                    
+    def close(self,report=True):
+        '''
+        write all the queued images and stop the threads.
+        return the list of (file,exception) of the failed writes.
+        '''
+        if self._threads:
+            for _ in self._threads:
+                self._queue.put(None)
+            for thread in self._threads:
+                thread.join()
+            self._threads = []
+            if report:
+                print(self.report())
+        return self.errors
+    
+    def report(self):
+        elapsed = time.perf_counter()-self._start
+        msg = '{} images written, {:.1f} MB in {:.2f} s ({:.1f} MB/s)'.format(
+            self.written,self.nbytes/1e6,elapsed,self.nbytes/1e6/max(elapsed,1e-9))
+        for file,e in self.errors:
+            msg += '\nwrite error {}: {}'.format(file,e)
+        return msg
+
+def _acquisition_writer(writer,catalog):
+    '''
+    writer of an acquisition and the context closing it: a new ImageWriter
+    adding the files to catalog if writer is None, else the given writer,
+    which is not closed. the files are added to the catalog by the writer
+    once written, so catalog must be the catalog of a given writer.
+    '''
+    if writer is None:
+        writer = ImageWriter(catalog=catalog)
+        return writer,writer
+    if catalog is not None and catalog is not writer.catalog:
+        raise ValueError('catalog must be given to the writer: ImageWriter(catalog=catalog)')
+    return writer,nullcontext()
 
 class CamState():
     '''
     get camera current state
+    if ranges, also read the limits used to validate a configuration
+    (see cam_apply_config): the sensor size, the size ranges and the pixel
+    formats of the camera.
     '''
-    def __init__(self,cam):
+    def __init__(self,cam,ranges=False):
       
         # print(dir(cam))
         self.name = cam.get_name()
@@ -41,6 +164,18 @@ class CamState():
         self._base = cam.ExposureAutoTimebase.get()
         self.exposure_time = cam.ExposureTime.get()
         self.pixel_format = str(cam.get_pixel_format())
+        self.ranges = ranges
+        if ranges:
+            self.width_range = cam.Width.get_range()
+            self.height_range = cam.Height.get_range()
+            #max width (height) = sensor width - offset_x (offset_y)
+            self.sensor_size = (self.offset_x+self.width_range[1],
+                                self.offset_y+self.height_range[1])
+            self.pixel_formats = cam.get_pixel_formats()
+    
+    @property
+    def time_base(self):
+        return self._base
     
     def __str__(self):
         msg = self.name+'\n'
@@ -56,11 +191,8 @@ class CamState():
 def current_state():
     print('Camera Current State')
     print('--------------------')
-    with Vimba.get_instance() as vimba:
-        cams = vimba.get_all_cameras()
-        with cams[0] as cam:
-            print(CamState(cam))
-        print('--------------------')
+    print(_session_call('state'))
+    print('--------------------')
         
 def cal_time_base(t):
     offset = 38
@@ -94,15 +226,11 @@ def cam_set_exposure_time(cam,exposure_time):
     cam.get_framce(timtout_ms=2000), the solution is change this value for
     long exposure time timeout_ms = (t_s+1)*1000
     '''
-    exposure_min = 77
-    exposure_max = 67108901
-    # exposure_max = 1900000
-    nmax = 200
-    if exposure_time<exposure_min:
-        print('exposure time cannot < {} s'.format(exposure_min/1e6))
+    if exposure_time<_exposure_min:
+        print('exposure time cannot < {} s'.format(_exposure_min/1e6))
         return False
-    if exposure_time>exposure_max:
-        print('exposure time cannot > {} s'.format(exposure_max/1e6))
+    if exposure_time>_exposure_max:
+        print('exposure time cannot > {} s'.format(_exposure_max/1e6))
         return False
     if(exposure_time != cam.ExposureTime.get()):
         #calculate time base for new exposure time
@@ -115,7 +243,7 @@ def cam_set_exposure_time(cam,exposure_time):
         #check
         t_dif = np.abs(exposure_time-cam.ExposureTime.get())
         i = 0
-        while (t_dif>0 and i<nmax):
+        while (t_dif>0 and i<_nmax):
             #try again
             cam.ExposureTime.set(exposure_time)
             t_dif = np.abs(exposure_time-cam.ExposureTime.get())
@@ -136,12 +264,8 @@ def cam_set_pixel_format(cam,pixel_format):
     '''
     pixel_formats = cam.get_pixel_formats()
     ret = True
-    if pixel_format=='rgb16':
-        cam.set_pixel_format(pixel_formats[3])
-    elif pixel_format=='rgb8':
-        cam.set_pixel_format(pixel_formats[1])
-    elif pixel_format=='mono8':
-        cam.set_pixel_format(pixel_formats[0])
+    if pixel_format in _pixel_format_index:
+        cam.set_pixel_format(pixel_formats[_pixel_format_index[pixel_format]])
     else:
         print('pixel_format error, current format will used')
         ret = False
@@ -214,6 +338,191 @@ def cam_set_frame_size(cam,size):
         ret = False
     return ret
 
+def _paced_frames(cam,n,timeout_ms,sleep):
+    #n (data,datetime,frame) frames taken by get_frame, sleep s after each frame
+    for c in range(n):
+        #get a frame
+        frame = cam.get_frame(timeout_ms)  
+        #get datetime
+        now = datetime.now()
+        #get numpy array image, is a bayer 2d array
+        yield frame.as_numpy_ndarray()[:,:,0],now,frame
+        time.sleep(sleep)
+
+def cam_stream_frames(cam,n,buffer_count=10,timeout_ms=2000,pool=None):
+    '''
+    generator of n (data,datetime,frame) frames acquired in streaming mode,
+    at the frame rate of the camera: buffer_count frames are announced once,
+    the frame handler copies each frame into a frame leased from pool and
+    queues the frame again, there is no capture setup per frame like in
+    get_frame. data is the bayer 2d array of the leased frame, call
+    frame.release() once data is not used anymore so its buffer is reused
+    (not released frames are garbage collected).
+    incomplete frames are skipped. the copies wait in memory until they are
+    consumed, at most n frames.
+    streaming stops when the generator ends or is closed: use it in a for
+    loop or with contextlib.closing, so it is closed on exception.
+    cam: camera object
+    timeout_ms: max time between 2 frames, RuntimeError if exceeded
+    pool: FramePool of the copies, a FramePool(buffer_count) if None
+    '''
+    if pool is None:
+        pool = FramePool(buffer_count)
+    frames = queue.Queue()
+    counts = {'received':0,'incomplete':0}
+    
+    def handler(cam,frame):
+        if frame.get_status()!=FrameStatus.Complete:
+            counts['incomplete'] += 1
+        elif counts['received']<n:
+            counts['received'] += 1
+            frames.put((pool.copy(frame),datetime.now()))
+        cam.queue_frame(frame)
+        
+    cam.start_streaming(handler,buffer_count=buffer_count)
+    try:
+        for c in range(n):
+            try:
+                frame,now = frames.get(timeout=timeout_ms/1000)
+            except queue.Empty:
+                raise RuntimeError('no frame received in {} ms, {} of {} frames acquired'.format(
+                    timeout_ms,c,n))
+            yield frame.as_numpy_ndarray()[:,:,0],now,frame
+    finally:
+        cam.stop_streaming()
+        #copies not consumed
+        while not frames.empty():
+            frames.get()[0].release()
+        if counts['incomplete']:
+            print('{} incomplete frames skipped'.format(counts['incomplete']))
+
+def _config_targets(config,state):
+    #target (pixel_format,width,height,offset_x,offset_y,exposure_time) of
+    #config, validated against the ranges of state, None if invalid
+    pixel_format = config.get('pixel_format')
+    names = [str(fmt) for fmt in state.pixel_formats]
+    if pixel_format is not None:
+        if pixel_format in _pixel_format_index:
+            pixel_format = names[_pixel_format_index[pixel_format]]
+        elif str(pixel_format) in names:
+            pixel_format = str(pixel_format)
+        else:
+            print('pixel_format error: must be one of {} or {}'.format(
+                list(_pixel_format_index),names))
+            return None
+    else:
+        pixel_format = state.pixel_format
+    width,height = state.width,state.height
+    offset_x,offset_y = state.offset_x,state.offset_y
+    if 'roi' in config:
+        width,height,offset_x,offset_y = config['roi']
+    if 'size' in config:
+        width,height = config['size']
+    if 'offset' in config:
+        offset_x,offset_y = config['offset']
+    width,height,offset_x,offset_y = int(width),int(height),int(offset_x),int(offset_y)
+    ret = True
+    for name,size,offset,size_range,sensor in (
+            ('width',width,offset_x,state.width_range,state.sensor_size[0]),
+            ('height',height,offset_y,state.height_range,state.sensor_size[1])):
+        if size<size_range[0] or size+offset>sensor:
+            print('{} config error: must be >= {} and {} + offset <= {}'.format(
+                name,size_range[0],name,sensor))
+            ret = False
+        if offset<0 or offset%2:
+            print('offset error: {} offset must be a positive multiple of 2'.format(name))
+            ret = False
+    exposure_time = config.get('exposure_time')
+    if exposure_time is None:
+        exposure_time = state.exposure_time
+    else:
+        exposure_time = round(exposure_time*1e6)
+        if exposure_time<_exposure_min or exposure_time>_exposure_max:
+            print('exposure time must be between {} and {} s'.format(
+                _exposure_min/1e6,_exposure_max/1e6))
+            ret = False
+    if not ret:
+        return None
+    return pixel_format,width,height,offset_x,offset_y,exposure_time
+
+def cam_apply_config(cam,config,state=None):
+    '''
+    apply a configuration, only the features whose value differs from the
+    camera state are written.
+    cam: camera object
+    config: dict with any of
+        pixel_format: 'rgb16', 'rgb8', 'mono8' or a pixel format name
+        roi: (width,height,offset_x,offset_y)
+        size: (width,height)
+        offset: (offset_x,offset_y)
+        exposure_time: in s
+        see also profiles.
+    state: CamState(cam,ranges=True) of the camera, read if None. it is not
+    modified, the returned state has the new values and can be used for the
+    next call. if a write raises, no state is returned and the camera state
+    must be read again.
+    the configuration is validated before any write, nothing is written if
+    it is invalid.
+    return: (bool, True if the configuration is applied, state)
+    '''
+    if state is None or not state.ranges:
+        state = CamState(cam,ranges=True)
+    else:
+        #the state given is kept unchanged if a write fails
+        state = copy.copy(state)
+    targets = _config_targets(config,state)
+    if targets is None:
+        return False,state
+    pixel_format,width,height,offset_x,offset_y,exposure_time = targets
+    
+    if pixel_format!=state.pixel_format:
+        names = [str(fmt) for fmt in state.pixel_formats]
+        cam.set_pixel_format(state.pixel_formats[names.index(pixel_format)])
+        state.pixel_format = pixel_format
+    
+    #a size can only grow if the offset leaves room for it, and an offset
+    #can only move if the size fits: shrink first, then move, then grow
+    offset_changed = (offset_x,offset_y)!=(state.offset_x,state.offset_y)
+    if width<state.width:
+        cam.Width.set(width)
+    if height<state.height:
+        cam.Height.set(height)
+    if offset_x!=state.offset_x:
+        cam.OffsetX.set(offset_x)
+    if offset_y!=state.offset_y:
+        cam.OffsetY.set(offset_y)
+    if width>state.width:
+        cam.Width.set(width)
+    if height>state.height:
+        cam.Height.set(height)
+    state.width,state.height = width,height
+    state.offset_x,state.offset_y = offset_x,offset_y
+    state.width_range = (state.width_range[0],state.sensor_size[0]-offset_x)
+    state.height_range = (state.height_range[0],state.sensor_size[1]-offset_y)
+    
+    if offset_changed:
+        #the camera registers a new offset only with a frame (see cam_set_offset)
+        cam.ExposureTime.set(100)
+        cam.get_frame()
+        state.exposure_time = None
+    
+    ret = True
+    if exposure_time!=state.exposure_time:
+        time_base = cal_time_base(exposure_time)
+        if time_base!=str(state.time_base):
+            cam.ExposureAutoTimebase.set(time_base)
+            state._base = time_base
+        cam.ExposureTime.set(exposure_time)
+        state.exposure_time = cam.ExposureTime.get()
+        i = 0
+        while state.exposure_time!=exposure_time and i<_nmax:
+            #try again
+            cam.ExposureTime.set(exposure_time)
+            state.exposure_time = cam.ExposureTime.get()
+            i+=1
+        ret = state.exposure_time==exposure_time
+    return ret,state
+
 # def cam_config(cam,pixel_format=None,width=None,height=None,\
 #             offset_x=None,offset_y=None):
 #     '''
@@ -282,100 +591,364 @@ def cam_set_frame_size(cam,size):
             
 #     vimba._shutdown()
 
+
+def _count_startup(func):
+    #methods of CameraSession which started their own vimba session when
+    #they were module functions, counted to report the saved startup time
+    @functools.wraps(func)
+    def wrapper(self,*args,**kwargs):
+        self.calls += 1
+        return func(self,*args,**kwargs)
+    return wrapper
+
+class CameraSession():
+    '''
+    vimba and the camera opened once for a sequence of configurations and
+    acquisitions, instead of a vimba startup, camera discovery and opening
+    at each module function call:
+        with CameraSession() as session:
+            session.config_mono8_640x480c()
+            session.multiple_acquisition(10,path)
+    the module functions use the active session if there is one, or open
+    their own one.
+    at exit, the startup time saved by the session is reported.
+    index: index of the camera in vimba.get_all_cameras()
+    '''
+    _active = None
+    
+    def __init__(self,index=0,report=True):
+        self.index = index
+        self.report = report
+        self.calls = 0
+        self.startup_time = 0.
+        self.shutdown_time = 0.
+        self.cam = None
+        self.cam_state = None
+        self._vimba = None
+        
+    def __enter__(self):
+        t0 = time.perf_counter()
+        self._vimba = Vimba.get_instance().__enter__()
+        try:
+            cams = self._vimba.get_all_cameras()
+            self.cam = cams[self.index].__enter__()
+        except:
+            self._vimba.__exit__(None,None,None)
+            raise
+        self.startup_time = time.perf_counter()-t0
+        if CameraSession._active is None:
+            CameraSession._active = self
+        return self
+    
+    def __exit__(self,exc_type,exc_value,exc_traceback):
+        if CameraSession._active is self:
+            CameraSession._active = None
+        t0 = time.perf_counter()
+        try:
+            self.cam.__exit__(exc_type,exc_value,exc_traceback)
+        finally:
+            self._vimba.__exit__(exc_type,exc_value,exc_traceback)
+            self._vimba._shutdown()
+        self.shutdown_time = time.perf_counter()-t0
+        self.cam = None
+        self.cam_state = None
+        if self.report and self.calls>1:
+            print('CameraSession: {} calls in one session, {:.2f} s of startup saved'.format(
+                self.calls,self.saved_time()))
+            
+    def saved_time(self):
+        '''
+        estimated time in s saved compared to a vimba session per call
+        '''
+        return max(self.calls-1,0)*(self.startup_time+self.shutdown_time)
+    
+    @_count_startup
+    def state(self):
+        return CamState(self.cam)
+    
+    @_count_startup
+    def apply_config(self,config):
+        '''
+        apply a configuration dict or the name of one of the profiles,
+        see cam_apply_config. the camera state is cached by the session, so
+        successive configurations only write the features that changed.
+        '''
+        if isinstance(config,str):
+            config = profiles[config]
+        #the cache is invalid until all the writes succeeded
+        state,self.cam_state = self.cam_state,None
+        ret,self.cam_state = cam_apply_config(self.cam,config,state)
+        return ret
+    
+    @_count_startup
+    def set_exposure_time(self,t):
+        '''
+        t: exposure time in s
+        return: bool, Ture if exposure time is correctly set
+        '''
+        self.cam_state = None
+        return cam_set_exposure_time(self.cam,t*1e6)
+    
+    @_count_startup
+    def set_pixel_format(self,pixel_format):
+        #set pixel format: rgb16, rgb8, mono8
+        self.cam_state = None
+        return cam_set_pixel_format(self.cam,pixel_format)
+    
+    def reset_offset(self):
+        '''
+        reset offset to 0
+        '''
+        return self.set_offset((0,0))
+    
+    @_count_startup
+    def set_offset(self,offset):
+        self.cam_state = None
+        return cam_set_offset(self.cam,offset)
+    
+    @_count_startup
+    def set_frame_size(self,size):
+        self.cam_state = None
+        return cam_set_frame_size(self.cam,size)
+    
+    def set_frame_size_full(self):
+        ret = self.reset_offset()
+        if ret:
+            ret = self.set_frame_size((1920,1080))
+        return ret
+    
+    def set_frame_size_sub(self,size):
+        '''
+        the offset set will reset to 0 with this function.
+        size = (nx,ny)
+        '''
+        ret = self.reset_offset()
+        if ret:
+            ret = self.set_frame_size(size)
+        return ret
+    
+    def set_frame_size_sub_center(self,size):
+        '''
+        the sub frame is base on center of image
+        '''
+        ret = self.set_frame_size_sub(size)
+        if ret:    
+            #calculate the offset
+            width,height = size
+            offset_x = (1920-width)/2
+            offset_y = (1080-height)/2
+            ret = self.set_offset((offset_x,offset_y))
+        return ret
+    
+    def config_rgb16_1920x1080(self):
+        '''
+        configuration for rgb16 full frame
+        '''
+        return self.apply_config('rgb16_1920x1080')
+        
+    def config_mono8_640x480c(self):
+        '''
+        configuraiton for a roi frame of 640x480 at center of image
+        mono8.
+        '''
+        return self.apply_config('mono8_640x480c')
+        
+    @_count_startup
+    def single_acquisition(self,t=None,path=None,head='pike',show=False,fn=-1,\
+                           description = "single image acquisition",catalog=None):
+        '''
+        see single_acquisition
+        '''
+        ret = ''
+        cam = self.cam
+        self.cam_state = None
+        t_ret = True
+        if t:
+            t_ret = cam_set_exposure_time(cam, t*1e6)             
+        if t_ret:  
+            timeout_ms = int((t+_timeout_s_offset)*1000)
+            if timeout_ms<2000:
+                timeout_ms = 2000
+            #get a frame
+            frame = cam.get_frame(timeout_ms)  
+            #get datetime
+            now = datetime.now()
+            #sleep time in s
+            real_wait = _timeout_s_offset                        
+            time.sleep(t+real_wait)
+            #read cam state
+            state = CamState(cam)                   
+            #get numpy array image, is a bayer 2d array
+            data = frame.as_numpy_ndarray()[:,:,0]
+            if path:        
+                img = Image.fromarray(data)
+                #create exif tags
+                dt = now.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+                img.tag = create_exif_tag(state.name,state.pixel_format,dt,
+                                          state.exposure_time/1e6,
+                                          state.offset_x,state.offset_y,
+                                          fnumber=fn,description=description)
+                t_str = str(int(state.exposure_time)).zfill(8)
+                file = os.path.join(path,head+'_'+t_str+'.tif')
+                img.save(file,tiffinfo=img.tag)
+                if catalog is not None:
+                    catalog.add(file)
+                ret = file         
+            if show:
+                import matplotlib.pyplot as plt
+                plt.figure()
+                plt.imshow(data)
+                plt.axis('off')
+        return ret
+    
+    @_count_startup
+    def multiple_acquisition(self,n, path,head='pike_multi',wait=None,fn=-1,\
+                             description="multi image acquisition",catalog=None,
+                             writer=None,burst=False,buffer_count=10):
+        '''
+        see multiple_acquisition
+        '''
+        ret = []
+        cam = self.cam
+        writer,writer_context = _acquisition_writer(writer,catalog)
+        with writer_context:
+            state = CamState(cam)
+            #timeout in ms
+            timeout_ms = int(((state.exposure_time/1e6)+_timeout_s_offset)*1000)
+            if timeout_ms<2000:
+                timeout_ms = 2000
+            #sleep time in s
+            real_wait = _timeout_s_offset
+            if wait:
+                if real_wait < wait:
+                    real_wait = wait
+            if burst:
+                frames = cam_stream_frames(cam,n,buffer_count,timeout_ms)
+            else:
+                frames = _paced_frames(cam,n,timeout_ms,
+                                       (state.exposure_time/1e6)+real_wait)
+            #closing stops the streaming if saving raises
+            with closing(frames):
+                for c,(data,now,frame) in enumerate(frames,1):
+                    #create exif tags
+                    dt = now.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]                    
+                    tag = create_exif_tag(state.name,state.pixel_format,dt,
+                                          state.exposure_time/1e6,
+                                          state.offset_x,state.offset_y,
+                                          fnumber=fn,description=description)
+                    c_str = str(c).zfill(2)
+                    t_str = str(int(state.exposure_time)).zfill(8)
+                    file = os.path.join(path,head+'_'+c_str+'_'+t_str+'.tif')
+                    writer.save(data,tag,file,release=frame.release)
+                    ret.append(file)
+        return ret
+    
+    @_count_startup
+    def hdr_acquisition(self,lt,path,head='pike_seq',wait=None,\
+                        fn=-1,description = "hdr images acquisition",catalog=None,
+                        writer=None):
+        '''
+        see hdr_acquisition
+        '''
+        ret = []
+        cam = self.cam
+        self.cam_state = None
+        writer,writer_context = _acquisition_writer(writer,catalog)
+        with writer_context:
+            state = CamState(cam)
+            c = 1
+            for t in lt:
+                t_ret = cam_set_exposure_time(cam, t*1e6)
+                if t_ret:  
+                    timeout_ms = int((t+_timeout_s_offset)*1000)
+                    if timeout_ms<2000:
+                        timeout_ms = 2000
+                    #get a frame
+                    frame = cam.get_frame(timeout_ms)  
+                    #get datetime
+                    now = datetime.now()
+                    #get numpy array image, is a bayer 2d array
+                    data = frame.as_numpy_ndarray()[:,:,0]
+                    #create exif tags
+                    dt = now.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+                    exposure_real = cam.ExposureTime.get()
+                    tag = create_exif_tag(state.name,state.pixel_format,dt,
+                                          exposure_real/1e6,
+                                          state.offset_x,state.offset_y,
+                                          fnumber=fn,description=description)
+                    c_str = str(c).zfill(2)
+                    t_str = str(int(exposure_real)).zfill(8)
+                    file = os.path.join(path,head+'_'+c_str+'_'+t_str+'.tif')
+                    writer.save(data,tag,file)
+                    ret.append(file)
+                    c+=1
+                    #sleep time in s
+                    real_wait = _timeout_s_offset
+                    if wait:
+                        if real_wait < wait:
+                            real_wait = wait                        
+                    time.sleep(t+real_wait)
+        return ret
+
+def _session_call(name,*args,**kwargs):
+    #call a CameraSession method in the active session, or in a new one
+    if CameraSession._active is not None:
+        return getattr(CameraSession._active,name)(*args,**kwargs)
+    with CameraSession() as session:
+        return getattr(session,name)(*args,**kwargs)
+
 def state():
-    with Vimba.get_instance() as vimba:
-        cams = vimba.get_all_cameras()
-        with cams[0] as cam:
-            print(CamState(cam))
-    vimba._shutdown()
+    print(_session_call('state'))
+
 
+def apply_config(config):
+    '''
+    apply a configuration dict or the name of one of the profiles,
+    only the features that changed are written, see cam_apply_config
+    '''
+    return _session_call('apply_config',config)
 
 def set_exposure_time(t):
     '''
     t: exposure time in s
     return: bool, Ture if exposure time is correctly set
     '''
-    with Vimba.get_instance() as vimba:
-        cams = vimba.get_all_cameras()
-        with cams[0] as cam:
-            exposure_time = t*1e6
-            ret = cam_set_exposure_time(cam, exposure_time)
-    vimba._shutdown()
-    return ret
+    return _session_call('set_exposure_time',t)
 
 def set_pixel_format(pixel_format):
     #set pixel format: rgb16, rgb8, mono8
-    with Vimba.get_instance() as vimba:
-        cams = vimba.get_all_cameras()
-        with cams[0] as cam:
-            ret = cam_set_pixel_format(cam, pixel_format)
-    vimba._shutdown()
-    return ret
+    return _session_call('set_pixel_format',pixel_format)
 
 def reset_offset():
     '''
     reset offset to 0
     '''
-    ret = False
-    with Vimba.get_instance() as vimba:
-        cams = vimba.get_all_cameras()
-        with cams[0] as cam:
-            ret = cam_set_offset(cam,(0,0))
-    vimba._shutdown()
-    return ret
+    return _session_call('reset_offset')
 
 def set_offset(offset):
-    ret = False
-    with Vimba.get_instance() as vimba:
-        cams = vimba.get_all_cameras()
-        with cams[0] as cam:
-            ret = cam_set_offset(cam,offset)
-    vimba._shutdown()
-    return ret
+    return _session_call('set_offset',offset)
 
 def set_frame_size_full():
-    ret = reset_offset()
-    if ret:
-        with Vimba.get_instance() as vimba:
-            cams = vimba.get_all_cameras()
-            with cams[0] as cam:
-                ret = cam_set_frame_size(cam,(1920,1080))
-        vimba._shutdown()
-    return ret
+    return _session_call('set_frame_size_full')
 
 def set_frame_size_sub(size):
     '''
     the offset set will reset to 0 with this function.
     size = (nx,ny)
     '''
-    ret = reset_offset()
-    if ret:
-        with Vimba.get_instance() as vimba:
-            cams = vimba.get_all_cameras()
-            with cams[0] as cam:
-                ret = cam_set_frame_size(cam,size)
-        vimba._shutdown()
-    return ret
+    return _session_call('set_frame_size_sub',size)
 
 def set_frame_size_sub_center(size):
     '''
     the sub frame is base on center of image
     '''
-    ret = set_frame_size_sub(size)
-    if ret:    
-        #calculate the offset
-        width,height = size
-        offset_x = (1920-width)/2
-        offset_y = (1080-height)/2
-        ret = set_offset((offset_x,offset_y))
-    return ret
+    return _session_call('set_frame_size_sub_center',size)
 
 def config_rgb16_1920x1080():
     '''
     configuration for rgb16 full frame
     '''
-    set_pixel_format('rgb16')
-    set_frame_size_full()
+    return _session_call('config_rgb16_1920x1080')
 
 
 def config_mono8_640x480c():
@@ -383,108 +956,41 @@ def config_mono8_640x480c():
     configuraiton for a roi frame of 640x480 at center of image
     mono8.
     '''
-    set_pixel_format('mono8')
-    set_frame_size_sub_center((640,480))
+    return _session_call('config_mono8_640x480c')
 
 def single_acquisition(t=None,path=None,head='pike',show=False,fn=-1,\
-                       description = "single image acquisition"):
+                       description = "single image acquisition",catalog=None):
     '''
     All camera configuration, including pixel_format, bits, image size, exposure,
     must be condigured before call this function
+    catalog: optional catalog.Catalog, the saved file is added to it
     '''    
-    ret = ''
-    with Vimba.get_instance() as vimba:
-        cams = vimba.get_all_cameras()
-        with cams[0] as cam: 
-            t_ret = True
-            if t:
-                t_ret = cam_set_exposure_time(cam, t*1e6)             
-            if t_ret:  
-                timeout_ms = int((t+_timeout_s_offset)*1000)
-                if timeout_ms<2000:
-                    timeout_ms = 2000
-                #get a frame
-                frame = cam.get_frame(timeout_ms)  
-                #get datetime
-                now = datetime.now()
-                #sleep time in s
-                real_wait = _timeout_s_offset                        
-                time.sleep(t+real_wait)
-                #read cam state
-                state = CamState(cam)                   
-                #get numpy array image, is a bayer 2d array
-                data = frame.as_numpy_ndarray()[:,:,0]
-                if path:        
-                    img = Image.fromarray(data)
-                    #create exif tags
-                    dt = now.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-                    img.tag = create_exif_tag(state.name,state.pixel_format,dt,
-                                              state.exposure_time/1e6,
-                                              state.offset_x,state.offset_y,
-                                              fnumber=fn,description=description)
-                    t_str = str(int(state.exposure_time)).zfill(8)
-                    file = os.path.join(path,head+'_'+t_str+'.tif')
-                    img.save(file,tiffinfo=img.tag)
-                    ret = file         
-                if show:
-                    plt.figure()
-                    plt.imshow(data)
-                    plt.axis('off')
-    
-    vimba._shutdown()
-    return ret
+    return _session_call('single_acquisition',t=t,path=path,head=head,show=show,
+                         fn=fn,description=description,catalog=catalog)
 
 
 def multiple_acquisition(n, path,head='pike_multi',wait=None,fn=-1,\
-                         description="multi image acquisition"):
+                         description="multi image acquisition",catalog=None,
+                         writer=None,burst=False,buffer_count=10):
     '''
     multiple acquisition of n number images with same exposure time.
     the exposure time must be configured before call this function.
+    catalog: optional catalog.Catalog, the saved files are added to it
+    writer: optional ImageWriter saving the images in background, a new one
+    is used (and closed at the end) if None. with a writer, the catalog is
+    the one of the writer (ValueError if another catalog is given)
+    burst: if True, the images are acquired in streaming mode at the camera
+    frame rate (see cam_stream_frames) and wait is not used, else one frame
+    is taken every exposure time + wait
+    buffer_count: number of frame buffers of the burst mode
     '''
-    
-    ret = []
-    with Vimba.get_instance() as vimba:
-        cams = vimba.get_all_cameras()
-        with cams[0] as cam: 
-            state = CamState(cam)
-            #timeout in ms
-            timeout_ms = int(((state.exposure_time/1e6)+_timeout_s_offset)*1000)
-            if timeout_ms<2000:
-                timeout_ms = 2000
-            #sleep time in s
-            real_wait = _timeout_s_offset
-            if wait:
-                if real_wait < wait:
-                    real_wait = wait
-            for c in range(n):
-                c+=1
-                    
-                #get a frame
-                frame = cam.get_frame(timeout_ms)  
-                #get datetime
-                now = datetime.now()
-                #get numpy array image, is a bayer 2d array
-                data = frame.as_numpy_ndarray()[:,:,0]
-                img = Image.fromarray(data)
-                #create exif tags
-                dt = now.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]                    
-                img.tag = create_exif_tag(state.name,state.pixel_format,dt,
-                                              state.exposure_time/1e6,
-                                              state.offset_x,state.offset_y,
-                                              fnumber=fn,description=description)
-                c_str = str(c).zfill(2)
-                t_str = str(int(state.exposure_time)).zfill(8)
-                file = os.path.join(path,head+'_'+c_str+'_'+t_str+'.tif')
-                img.save(file,tiffinfo=img.tag)
-                ret.append(file)
-                
-                time.sleep((state.exposure_time/1e6)+real_wait)
-                    
-    vimba._shutdown()
-    return ret
+    return _session_call('multiple_acquisition',n,path,head=head,wait=wait,fn=fn,
+                         description=description,catalog=catalog,writer=writer,
+                         burst=burst,buffer_count=buffer_count)
         
 def hdr_acquisition(lt,path,head='pike_seq',wait=None,\
-                    fn=-1,description = "hdr images acquisition"):
+                    fn=-1,description = "hdr images acquisition",catalog=None,
+                    writer=None):
     '''
     use this function for sequence hdr images acquisition, 
     only exposure time can be changed for each frame.
@@ -497,51 +1003,14 @@ def hdr_acquisition(lt,path,head='pike_seq',wait=None,\
         sleep time should > exposure time
         slepp time = t + wait
         if wait==None, sleep time = t+_timeout_s
+        catalog: optional catalog.Catalog, the saved files are added to it
+        writer: optional ImageWriter saving the images in background,
+        a new one is used (and closed at the end) if None. with a writer,
+        the catalog is the one of the writer (ValueError if another
+        catalog is given)
         
     Return:
         ret: return the list of filename
     '''
-    ret = []
-    with Vimba.get_instance() as vimba:
-        cams = vimba.get_all_cameras()
-        with cams[0] as cam: 
-            state = CamState(cam)
-            c = 1
-            for t in lt:
-                t_ret = cam_set_exposure_time(cam, t*1e6)
-                if t_ret:  
-                    timeout_ms = int((t+_timeout_s_offset)*1000)
-                    if timeout_ms<2000:
-                        timeout_ms = 2000
-                    #get a frame
-                    frame = cam.get_frame(timeout_ms)  
-                    #get datetime
-                    now = datetime.now()
-                    #get numpy array image, is a bayer 2d array
-                    data = frame.as_numpy_ndarray()[:,:,0]
-                    img = Image.fromarray(data)
-                    #create exif tags
-                    dt = now.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-                    exposure_real = cam.ExposureTime.get()
-                    img.tag = create_exif_tag(state.name,state.pixel_format,dt,
-                                              exposure_real/1e6,
-                                              state.offset_x,state.offset_y,
-                                              fnumber=fn,description=description)
-                    c_str = str(c).zfill(2)
-                    t_str = str(int(exposure_real)).zfill(8)
-                    file = os.path.join(path,head+'_'+c_str+'_'+t_str+'.tif')
-                    img.save(file,tiffinfo=img.tag)
-                    ret.append(file)
-                    c+=1
-                    #sleep time in s
-                    real_wait = _timeout_s_offset
-                    if wait:
-                        if real_wait < wait:
-                            real_wait = wait                        
-                    time.sleep(t+real_wait)
-                    
-    vimba._shutdown()
-    return ret         
-    
-
-
+    return _session_call('hdr_acquisition',lt,path,head=head,wait=wait,fn=fn,
+                         description=description,catalog=catalog,writer=writer)